@@ -2,7 +2,19 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from .const import DOMAIN, PLATFORMS
+from .const import (
+    BATTERY_HEALTH_STORAGE_KEY,
+    BATTERY_HEALTH_STORAGE_VERSION,
+    DATA_SCHEDULER,
+    DOMAIN,
+    EVENT_CURSOR_STORAGE_KEY,
+    EVENT_CURSOR_STORAGE_VERSION,
+    FLEET_MAX_CONCURRENT_POLLS,
+    FLEET_POLL_JITTER,
+    PLATFORMS,
+    TEST_HISTORY_STORAGE_KEY,
+    TEST_HISTORY_STORAGE_VERSION,
+)
 
 if TYPE_CHECKING:  # Only import Home Assistant types when available
     from homeassistant.config_entries import ConfigEntry
@@ -12,12 +24,30 @@ if TYPE_CHECKING:  # Only import Home Assistant types when available
 async def async_setup_entry(hass: "HomeAssistant", entry: "ConfigEntry") -> bool:
     # Import lazily so tests can run without Home Assistant installed
     from .coordinator import GreencellCoordinator
+    from .polling import FleetPollScheduler
 
     coordinator = GreencellCoordinator(hass, entry)
-    await coordinator.async_config_entry_first_refresh()
+    try:
+        await coordinator.async_config_entry_first_refresh()
+        await coordinator.async_load_test_history()
+    except Exception:
+        await coordinator.api.async_close()
+        raise
 
-    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    domain_data[entry.entry_id] = coordinator
+    scheduler = domain_data.get(DATA_SCHEDULER)
+    if scheduler is None:
+        scheduler = domain_data[DATA_SCHEDULER] = FleetPollScheduler(
+            hass.loop, FLEET_MAX_CONCURRENT_POLLS, FLEET_POLL_JITTER
+        )
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    scheduler.register(
+        entry.entry_id,
+        coordinator.next_poll_interval,
+        coordinator.async_refresh,
+    )
+    entry.async_on_unload(lambda: scheduler.unregister(entry.entry_id))
     entry.async_on_unload(
         entry.add_update_listener(
             lambda hass, e: hass.config_entries.async_reload(e.entry_id)
@@ -29,5 +59,17 @@ async def async_setup_entry(hass: "HomeAssistant", entry: "ConfigEntry") -> bool
 async def async_unload_entry(hass: "HomeAssistant", entry: "ConfigEntry") -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_shutdown()
     return unload_ok
+
+
+async def async_remove_entry(hass: "HomeAssistant", entry: "ConfigEntry") -> None:
+    from homeassistant.helpers.storage import Store
+
+    for version, key in (
+        (TEST_HISTORY_STORAGE_VERSION, TEST_HISTORY_STORAGE_KEY),
+        (EVENT_CURSOR_STORAGE_VERSION, EVENT_CURSOR_STORAGE_KEY),
+        (BATTERY_HEALTH_STORAGE_VERSION, BATTERY_HEALTH_STORAGE_KEY),
+    ):
+        await Store(hass, version, key.format(entry_id=entry.entry_id)).async_remove()
@@ -0,0 +1,139 @@
+"""Discharge-curve analysis of a single UPS test run.
+
+Runs as one vectorized NumPy pass; call it through an executor because a long
+test has thousands of samples.
+"""
+from __future__ import annotations
+
+from typing import Iterable, NamedTuple, Sequence
+
+import numpy as np
+
+from .measurements import Measurement
+
+# Degree of the polynomial fitted to voltage over time
+DISCHARGE_FIT_DEGREE = 2
+# Current must vary by at least this much (A) to estimate internal resistance
+MIN_CURRENT_SPREAD = 0.05
+# Samples (at least) in the tail used to extrapolate the time to low voltage
+TAIL_MIN_SAMPLES = 10
+# Never extrapolate the time to low voltage beyond this multiple of the test length
+MAX_EXTRAPOLATION = 10
+
+
+class DischargeColumns(NamedTuple):
+    """One test as columns, one row per distinct timestamp."""
+
+    time: np.ndarray  # seconds since the first sample
+    load: np.ndarray  # percent
+    voltage: np.ndarray  # volts
+    level: np.ndarray  # percent
+    started_at: int  # epoch milliseconds of the first sample
+
+
+class DischargeAnalysis(NamedTuple):
+    samples: int
+    duration: float  # seconds
+    start_voltage: float
+    end_voltage: float
+    sag_slope: float | None  # volts per minute, negative while discharging
+    internal_resistance: float | None  # ohms
+    time_to_low_nominal: float | None  # seconds from the start of the test
+    low_nominal_extrapolated: bool
+    discharge_curve: tuple[float, ...] | None  # polynomial, highest power first
+
+    def as_dict(self) -> dict:
+        return self._asdict()
+
+
+def to_columns(measurements: Iterable[Measurement | Sequence]) -> DischargeColumns | None:
+    """Sort samples by time and average rows that share a timestamp."""
+    rows = np.array(
+        [
+            (m[0], m[1] or 0.0, m[2] if m[2] is not None else np.nan, m[3] or 0.0)
+            for m in measurements
+            if m[0] is not None
+        ],
+        dtype=np.float64,
+    ).reshape(-1, 4)
+    if not len(rows):
+        return None
+    rows = rows[np.argsort(rows[:, 0], kind="stable")]
+    timestamps, starts, counts = np.unique(rows[:, 0], return_index=True, return_counts=True)
+    means = np.add.reduceat(rows[:, 1:], starts, axis=0) / counts[:, None]
+    return DischargeColumns(
+        time=(timestamps - timestamps[0]) / 1000.0,
+        load=means[:, 0],
+        voltage=means[:, 1],
+        level=means[:, 2],
+        started_at=int(timestamps[0]),
+    )
+
+
+def _time_to_low_nominal(
+    time: np.ndarray, voltage: np.ndarray, low_nominal: float
+) -> tuple[float | None, bool]:
+    below = np.flatnonzero(voltage <= low_nominal)
+    if below.size:
+        return float(time[below[0]]), False
+    # Extrapolate the trend of the final third, past any load step at the start
+    tail = slice(-max(TAIL_MIN_SAMPLES, time.size // 3), None)
+    if time[tail].size < 2 or np.ptp(time[tail]) <= 0:
+        return None, False
+    slope, intercept = np.polyfit(time[tail], voltage[tail], 1)
+    if slope >= 0:
+        return None, False
+    crossing = (low_nominal - intercept) / slope
+    if crossing > time[-1] * MAX_EXTRAPOLATION:
+        return None, False
+    return float(max(crossing, time[-1])), True
+
+
+def analyze_discharge(
+    measurements: Iterable[Measurement | Sequence],
+    low_nominal: float | None = None,
+    rated_power: float | None = None,
+    nominal_voltage: float | None = None,
+) -> DischargeAnalysis | None:
+    """Analyze one test; ``rated_power`` (W) and ``nominal_voltage`` (V) enable
+    the internal-resistance estimate, ``low_nominal`` (V) the time-to-empty."""
+    columns = to_columns(measurements)
+    if columns is None:
+        return None
+    valid = ~np.isnan(columns.voltage)
+    time, voltage, load = columns.time[valid], columns.voltage[valid], columns.load[valid]
+    if not time.size:
+        return None
+
+    sag_slope = None
+    curve = None
+    if time.size >= 2 and np.ptp(time) > 0:
+        sag_slope = float(np.polyfit(time, voltage, 1)[0] * 60.0)
+        degree = min(DISCHARGE_FIT_DEGREE, np.unique(time).size - 1)
+        curve = np.polyfit(time, voltage, degree)
+
+    internal_resistance = None
+    if rated_power and nominal_voltage:
+        # Battery current from the load share of the rated output power
+        current = load / 100.0 * rated_power / nominal_voltage
+        if np.ptp(current) >= MIN_CURRENT_SPREAD:
+            # Regress on time as well, so the discharge drift is not read as sag
+            design = np.column_stack((np.ones_like(time), time, current))
+            coefficients = np.linalg.lstsq(design, voltage, rcond=None)[0]
+            internal_resistance = float(max(-coefficients[2], 0.0))
+
+    time_to_low, extrapolated = (None, False)
+    if low_nominal is not None:
+        time_to_low, extrapolated = _time_to_low_nominal(time, voltage, low_nominal)
+
+    return DischargeAnalysis(
+        samples=int(time.size),
+        duration=float(time[-1]),
+        start_voltage=float(voltage[0]),
+        end_voltage=float(voltage[-1]),
+        sag_slope=sag_slope,
+        internal_resistance=internal_resistance,
+        time_to_low_nominal=time_to_low,
+        low_nominal_extrapolated=extrapolated,
+        discharge_curve=tuple(float(c) for c in curve) if curve is not None else None,
+    )
@@ -1,12 +1,64 @@
 import asyncio
+import base64
+import binascii
+import json as jsonlib
 import logging
-from typing import Optional
+import time
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Callable, Optional
 
 import aiohttp
 import async_timeout
 
+try:  # Home Assistant ships orjson; the stdlib decoder covers everything else
+    from orjson import loads as json_loads
+except ImportError:  # pragma: no cover
+    json_loads = jsonlib.loads
+
+from .circuit_breaker import CircuitBreaker
+from .events import EVENT_PAGE_SIZE, MAX_EVENT_PAGE, EventCursor, event_timestamp
+from .measurements import JsonArrayParser, Measurement
+from .metrics import LatencyTracker, RequestMetrics, endpoint_template
+from .request_queue import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_COMMAND,
+    PRIORITY_POLL,
+    RequestQueue,
+)
+
 _LOGGER = logging.getLogger(__name__)
 
+# Connection pool tuning for the UPS embedded web server
+POOL_KEEPALIVE_TIMEOUT = 60  # seconds
+POOL_DNS_CACHE_TTL = 300  # seconds
+
+# Token renewal: refresh this long before a known expiry, and never trust a
+# lifetime learned from a 401 that is shorter than the minimum below.
+TOKEN_REFRESH_MARGIN = 30  # seconds
+MIN_LEARNED_TOKEN_LIFETIME = 60  # seconds
+
+# Streaming reads: chunk size and how many decoded records may wait for the consumer
+STREAM_CHUNK_SIZE = 16 * 1024  # bytes
+MEASUREMENT_STREAM_BUFFER = 256  # records
+
+# Alternate paths per capability, in order of preference. Firmware versions
+# differ in which of them exist; the working one is probed once per host.
+ENDPOINT_VARIANTS = {
+    "specification": ("/api/specification", "/api/device/specification"),
+}
+# GreencellApi command method -> /api/commands action
+COMMAND_ACTIONS = {
+    "toggle_beeper": "beeperToggleOrder",
+    "shutdown": "shutdownOrder",
+    "wake_up": "wakeUpOrder",
+    "short_test": "shortTestOrder",
+    "long_test": "longTestOrder",
+    "cancel_test": "cancelTestOrder",
+}
+# Statuses that mean a remembered path vanished, i.e. the firmware changed
+ENDPOINT_GONE_STATUSES = {404, 405}
+
 
 class GreencellApiError(Exception):
     """Base error for Greencell API issues."""
@@ -19,11 +71,75 @@ class GreencellAuthError(GreencellApiError):
 class GreencellRequestError(GreencellApiError):
     """Transport or HTTP error while talking to the API."""
 
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
 
 class GreencellResponseError(GreencellApiError):
     """Response payload was invalid or missing required fields."""
 
 
+def _parse_expiration(value: Any) -> Optional[float]:
+    """Parse an expiration timestamp (epoch s/ms or ISO 8601) into epoch seconds."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, str) and value.strip().replace(".", "", 1).isdigit():
+        value = float(value)
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e12 else float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+def _jwt_expiration(token: str) -> Optional[float]:
+    """Return the `exp` claim of a JWT, or None when the token is opaque."""
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    payload = parts[1] + "=" * (-len(parts[1]) % 4)
+    try:
+        claims = jsonlib.loads(base64.urlsafe_b64decode(payload))
+    except (binascii.Error, ValueError):
+        return None
+    if not isinstance(claims, dict):
+        return None
+    return _parse_expiration(claims.get("exp"))
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    """Parse an HTTP ``Date`` header into epoch seconds."""
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def _token_lifetime(expiration_date: Any, token: str, now: float) -> Optional[float]:
+    """Remaining token lifetime in seconds from the login payload or the JWT itself.
+
+    ``now`` should be the device's clock: the expiry is stamped by the device,
+    so comparing it with a skewed local clock would shorten or stretch it.
+    Lifetimes too short to be plausible are reported as unknown.
+    """
+    expires = _parse_expiration(expiration_date)
+    if expires is None:
+        expires = _jwt_expiration(token)
+    if expires is None:
+        return None
+    lifetime = expires - now
+    if lifetime < MIN_LEARNED_TOKEN_LIFETIME:
+        _LOGGER.debug("Ignoring implausible token lifetime of %.0fs", lifetime)
+        return None
+    return lifetime
+
+
 class GreencellApi:
     def __init__(
         self,
@@ -31,27 +147,125 @@ class GreencellApi:
         password: str,
         session: Optional[aiohttp.ClientSession] = None,
         verify_ssl: bool = False,
+        max_concurrent_requests: int = 1,
+        timeout_overrides: Optional[dict[str, float]] = None,
+        json_decoder: Optional[Callable[[bytes], Any]] = None,
     ):
         self._host = host.rstrip("/")
         self._password = password
         self._token = None
         self._session = session
+        self._owns_session = session is None
+        self._connector: Optional[aiohttp.TCPConnector] = None
         self._verify_ssl = verify_ssl
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.login_count = 0
+        self._token_issued_at: Optional[float] = None
+        self._token_refresh_at: Optional[float] = None
+        self._learned_token_lifetime: Optional[float] = None
+        # Device clock minus ours, from the Date header of the latest response
+        self._clock_offset = 0.0
+        self._login_task: Optional[asyncio.Future] = None
+        self.queue = RequestQueue(max_concurrent_requests)
+        self.breaker = CircuitBreaker()
+        self.latency = LatencyTracker(timeout_overrides)
+        self.metrics = RequestMetrics()
+        self._json_loads = json_decoder or json_loads
+        self.capabilities: dict[str, str] = {}
+        self._probe_tasks: dict[str, asyncio.Future] = {}
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the session for this host, creating a pooled one on first use."""
+        if self._session is not None and not getattr(self._session, "closed", False):
+            return self._session
+        self._connector = aiohttp.TCPConnector(
+            # One connection per request the queue may have in flight, so no
+            # request spends its timeout waiting for a pooled connection
+            limit_per_host=self.queue.max_in_flight,
+            keepalive_timeout=POOL_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=POOL_DNS_CACHE_TTL,
+            use_dns_cache=True,
+        )
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(self._on_connection_create)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuse)
+        trace_config.on_dns_resolvehost_start.append(self._on_dns_start)
+        trace_config.on_dns_resolvehost_end.append(self._on_dns_end)
+        trace_config.on_dns_cache_hit.append(self._on_dns_cache_hit)
+        self._session = aiohttp.ClientSession(
+            connector=self._connector,
+            trace_configs=[trace_config],
+        )
+        self._owns_session = True
+        return self._session
+
+    async def _on_connection_create(self, session, ctx, params) -> None:
+        self.connections_created += 1
+
+    async def _on_connection_reuse(self, session, ctx, params) -> None:
+        self.connections_reused += 1
+
+    async def _on_dns_start(self, session, ctx, params) -> None:
+        ctx.dns_started = time.monotonic()
+
+    async def _on_dns_end(self, session, ctx, params) -> None:
+        self.metrics.record_dns(time.monotonic() - ctx.dns_started)
+
+    async def _on_dns_cache_hit(self, session, ctx, params) -> None:
+        self.metrics.dns_cache_hits += 1
+
+    async def async_close(self) -> None:
+        """Cancel outstanding requests and close the pooled session if this client created it."""
+        self.queue.close()
+        if not self._owns_session:
+            return
+        session, self._session = self._session, None
+        connector, self._connector = self._connector, None
+        if session is not None and hasattr(session, "close"):
+            close_result = session.close()
+            if asyncio.iscoroutine(close_result):
+                await close_result
+        if connector is not None and not connector.closed:
+            await connector.close()
+
+    async def _request(
+        self, method, path, json=None, session=None, expect_json=True, stream=None
+    ):
+        endpoint = endpoint_template(path)
+        stats = self.metrics.endpoint(endpoint)
+        stats.requests += 1
+        try:
+            return await self._send(
+                method, path, endpoint, stats, json, session, expect_json, stream
+            )
+        except GreencellApiError as err:
+            stats.record_error(err)
+            raise
 
-    async def _request(self, method, path, json=None, session=None, expect_json=True):
+    def _decode_loose(self, body: bytes) -> Any:
+        """Decode a command reply: JSON when possible, else a bare number or text."""
+        try:
+            return self._json_loads(body)
+        except ValueError:
+            text = body.decode("utf-8", errors="replace")
+            stripped = text.strip()
+            if stripped.isdigit():
+                return int(stripped)
+            return stripped or text
+
+    async def _send(self, method, path, endpoint, stats, json, session, expect_json, stream):
         headers = {}
         if self._token:
             headers["Authorization"] = f"Bearer {self._token}"
 
-        active_session = session or self._session
-        close_session = False
-        if active_session is None:
-            active_session = aiohttp.ClientSession()
-            close_session = True
+        active_session = session or self._get_session()
+        timeout = self.latency.timeout_for(endpoint)
+        started = time.monotonic()
 
         try:
-            _LOGGER.debug("HTTP %s %s (json=%s)", method, path, bool(json))
-            async with async_timeout.timeout(5):
+            _LOGGER.debug("HTTP %s %s (json=%s, timeout=%.1fs)", method, path, bool(json), timeout)
+            async with async_timeout.timeout(timeout) as deadline:
                 async with active_session.request(
                     method,
                     f"{self._host}{path}",
@@ -59,109 +273,234 @@ class GreencellApi:
                     headers=headers,
                     ssl=self._verify_ssl,
                 ) as resp:
+                    # Any HTTP answer proves the host is reachable
+                    self.breaker.record_success()
+                    device_time = _http_date(resp.headers.get("Date"))
+                    if device_time is not None:
+                        self._clock_offset = device_time - time.time()
                     if resp.status == 401:
-                        self._token = None
                         raise GreencellAuthError("Unauthorized")
                     try:
                         resp.raise_for_status()
                     except aiohttp.ClientResponseError as err:
-                        _LOGGER.debug(
-                            "HTTP %s %s failed status=%s headers=%s",
-                            method,
-                            path,
-                            err.status,
-                            dict(resp.headers),
-                        )
+                        if _LOGGER.isEnabledFor(logging.DEBUG):
+                            _LOGGER.debug(
+                                "HTTP %s %s failed status=%s headers=%s",
+                                method,
+                                path,
+                                err.status,
+                                dict(resp.headers),
+                            )
                         raise GreencellRequestError(
-                            f"HTTP error {err.status}: {err.message}"
+                            f"HTTP error {err.status}: {err.message}",
+                            status=err.status,
                         ) from err
-                    if expect_json:
+                    if stream is not None:
+                        # Latency is time to the headers; the timeout then
+                        # applies to each chunk read, never to the consumer
+                        elapsed = time.monotonic() - started
+                        size = 0
+                        loop = asyncio.get_running_loop()
+                        chunks = resp.content.iter_chunked(STREAM_CHUNK_SIZE)
                         try:
-                            data = await resp.json()
-                            _LOGGER.debug(
-                                "HTTP %s %s JSON OK headers=%s", method, path, dict(resp.headers)
-                            )
-                            return data
-                        except Exception as err:
-                            _LOGGER.debug(
-                                "HTTP %s %s JSON decode failed headers=%s", method, path, dict(resp.headers)
-                            )
-                            raise GreencellResponseError("Invalid JSON response") from err
+                            while True:
+                                deadline.reschedule(loop.time() + timeout)
+                                try:
+                                    chunk = await chunks.__anext__()
+                                except StopAsyncIteration:
+                                    break
+                                deadline.reschedule(None)
+                                size += len(chunk)
+                                await stream(chunk)
+                        except ValueError as err:
+                            raise GreencellResponseError("Invalid JSON stream") from err
+                        except asyncio.CancelledError:
+                            # The consumer went away: drop the rest of the body
+                            resp.close()
+                            raise
                     else:
-                        try:
-                            return await resp.json()
-                        except Exception:
-                            text = await resp.text()
-                            stripped = text.strip()
-                            if stripped.isdigit():
-                                return int(stripped)
-                            return stripped or text
+                        # One raw read; the device's content-type is not trusted
+                        body = await resp.read()
+            if stream is not None:
+                # Decoding was interleaved with the download
+                result = None
+                stats.record_response(size, None)
+            else:
+                decode_started = time.monotonic()
+                elapsed = decode_started - started
+                if expect_json:
+                    try:
+                        result = self._json_loads(body)
+                    except ValueError as err:
+                        _LOGGER.debug(
+                            "HTTP %s %s JSON decode failed (%d bytes)", method, path, len(body)
+                        )
+                        raise GreencellResponseError("Invalid JSON response") from err
+                else:
+                    result = self._decode_loose(body)
+                stats.record_response(len(body), time.monotonic() - decode_started)
+            self.latency.record(endpoint, elapsed)
+            stats.record_latency(elapsed)
             _LOGGER.debug("HTTP %s %s completed", method, path)
+            return result
         except asyncio.TimeoutError as err:
-            _LOGGER.warning("HTTP %s %s timed out", method, path)
+            self.breaker.record_failure()
+            self.latency.record_timeout(endpoint)
+            _LOGGER.warning("HTTP %s %s timed out after %.1fs", method, path, timeout)
             raise GreencellRequestError("Request timed out") from err
         except aiohttp.ClientError as err:
+            self.breaker.record_failure()
             _LOGGER.warning("HTTP %s %s client error: %s", method, path, err)
             raise GreencellRequestError("Request failed") from err
-        finally:
-            if close_session and hasattr(active_session, "close"):
-                close_result = active_session.close()
-                if asyncio.iscoroutine(close_result):
-                    await close_result
 
-    async def login(self, session=None):
+    async def login(self):
+        """Log in, joining a login that is already in flight."""
+        await self._async_ensure_token(force=True)
+
+    async def _login(self):
         data = await self._request(
             "POST",
             "/api/login",
             json={"password": self._password},
-            session=session,
         )
         try:
-            self._token = data["access_token"]
+            token = data["access_token"]
         except Exception as err:
             raise GreencellResponseError("Login response missing access_token") from err
+        self.login_count += 1
+        self._token = token
+        self._token_issued_at = time.monotonic()
+        self._token_refresh_at = None
+        lifetime = _token_lifetime(
+            data.get("expiration_date"), token, time.time() + self._clock_offset
+        )
+        if lifetime is not None:
+            margin = min(TOKEN_REFRESH_MARGIN, lifetime * 0.1)
+            self._token_refresh_at = self._token_issued_at + lifetime - margin
+        elif self._learned_token_lifetime is not None:
+            self._token_refresh_at = (
+                self._token_issued_at + self._learned_token_lifetime * 0.9
+            )
+
+    def _token_needs_refresh(self) -> bool:
+        if not self._token:
+            return True
+        if self._token_refresh_at is None:
+            return False
+        return time.monotonic() >= self._token_refresh_at
+
+    def _learn_token_lifetime(self) -> None:
+        """Remember how long a token lived when the device did not tell us."""
+        if self._token_issued_at is None or self._token_refresh_at is not None:
+            return
+        observed = time.monotonic() - self._token_issued_at
+        if observed < MIN_LEARNED_TOKEN_LIFETIME:
+            return
+        if self._learned_token_lifetime is None or observed < self._learned_token_lifetime:
+            self._learned_token_lifetime = observed
+            _LOGGER.debug("Learned token lifetime of %.0fs for %s", observed, self._host)
+
+    async def _async_ensure_token(self, rejected=None, force=False) -> None:
+        """Make sure a usable token exists, sharing a single login among all callers."""
+        if self._login_task is None:
+            if rejected is not None:
+                if rejected != self._token:
+                    # Another caller already renewed the token
+                    return
+                self._learn_token_lifetime()
+                self._token = None
+            elif not force and not self._token_needs_refresh():
+                return
+            self._login_task = asyncio.ensure_future(self._login())
+            self._login_task.add_done_callback(self._clear_login_task)
+        await asyncio.shield(self._login_task)
+
+    def _clear_login_task(self, task) -> None:
+        if self._login_task is task:
+            self._login_task = None
+        if not task.cancelled():
+            # Mark the exception as retrieved; waiters re-raise it themselves
+            task.exception()
+
+    async def _authed_request(
+        self, method, path, json=None, expect_json=True, priority=PRIORITY_POLL, stream=None
+    ):
+        """Queue a request for this host; identical queued GETs share one call."""
+        # A streamed body feeds one consumer, so it can never be shared
+        key = (method, path) if method == "GET" and stream is None else None
+        return await self.queue.run(
+            priority,
+            lambda: self._authed_call(method, path, json, expect_json, stream),
+            key=key,
+        )
 
-    async def _with_session(self, func):
-        if self._session:
-            return await func(self._session)
-        async with aiohttp.ClientSession() as session:
-            return await func(session)
-
-    async def fetch_specification(self):
-        async def _execute(session):
-            if not self._token:
-                await self.login(session=session)
-
+    async def _authed_call(self, method, path, json, expect_json, stream=None):
+        """Perform a request with a valid token, re-authenticating once on 401."""
+        if not self.breaker.allow():
+            raise GreencellRequestError(
+                f"{self._host} unreachable; retrying in {self.breaker.retry_in():.0f}s"
+            )
+        await self._async_ensure_token()
+        token = self._token
+        try:
+            return await self._request(
+                method, path, json=json, expect_json=expect_json, stream=stream
+            )
+        except GreencellAuthError:
+            # A 401 arrives before any body, so a stream has not been fed yet
+            await self._async_ensure_token(rejected=token)
+            return await self._request(
+                method, path, json=json, expect_json=expect_json, stream=stream
+            )
+
+    async def _capability_request(self, capability: str):
+        """GET the path remembered for a capability, probing variants when unknown."""
+        path = self.capabilities.get(capability)
+        if path is not None:
             try:
-                try:
-                    return await self._request("GET", "/api/specification", session=session)
-                except GreencellRequestError:
-                    return await self._request("GET", "/api/device/specification", session=session)
-            except GreencellAuthError:
-                await self.login(session=session)
-                try:
-                    return await self._request("GET", "/api/specification", session=session)
-                except GreencellRequestError:
-                    return await self._request("GET", "/api/device/specification", session=session)
+                return await self._authed_request("GET", path)
+            except GreencellRequestError as err:
+                if err.status not in ENDPOINT_GONE_STATUSES:
+                    raise
+                _LOGGER.debug(
+                    "Endpoint %s for %s disappeared (status=%s); re-probing",
+                    path,
+                    capability,
+                    err.status,
+                )
+                if self.capabilities.get(capability) == path:
+                    del self.capabilities[capability]
+
+        task = self._probe_tasks.get(capability)
+        if task is None:
+            task = asyncio.ensure_future(self._probe_capability(capability))
+            self._probe_tasks[capability] = task
+            task.add_done_callback(
+                lambda done: self._probe_tasks.pop(capability, None)
+            )
+        return await asyncio.shield(task)
+
+    async def _probe_capability(self, capability: str):
+        variants = ENDPOINT_VARIANTS[capability]
+        results = await asyncio.gather(
+            *(self._authed_request("GET", path) for path in variants),
+            return_exceptions=True,
+        )
+        for path, result in zip(variants, results):
+            if not isinstance(result, BaseException):
+                self.capabilities[capability] = path
+                _LOGGER.debug("Using %s for %s on %s", path, capability, self._host)
+                return result
+        for result in results:
+            if not isinstance(result, GreencellRequestError):
+                raise result
+        raise results[0]
 
-        return await self._with_session(_execute)
+    async def fetch_specification(self):
+        return await self._capability_request("specification")
 
     async def fetch_status(self):
-        async def _execute(session):
-            if not self._token:
-                await self.login(session=session)
-
-            try:
-                return await self._request(
-                    "GET", "/api/current_parameters", session=session
-                )
-            except GreencellAuthError:
-                await self.login(session=session)
-                return await self._request(
-                    "GET", "/api/current_parameters", session=session
-                )
-
-        return await self._with_session(_execute)
+        return await self._authed_request("GET", "/api/current_parameters")
 
     async def toggle_beeper(self):
         """Toggle UPS beeper on/off."""
@@ -189,155 +528,140 @@ class GreencellApi:
 
     async def fetch_statistics_tests(self):
         """Fetch history of UPS tests."""
-        async def _execute(session):
-            if not self._token:
-                await self.login(session=session)
-            try:
-                return await self._request(
-                    "GET", "/api/statistics/tests", session=session
-                )
-            except GreencellAuthError:
-                await self.login(session=session)
-                return await self._request(
-                    "GET", "/api/statistics/tests", session=session
-                )
-
-        return await self._with_session(_execute)
+        return await self._authed_request(
+            "GET", "/api/statistics/tests", priority=PRIORITY_BACKGROUND
+        )
 
     async def fetch_test_measurements(self, test_id: str):
         """Fetch measurements for a specific test run."""
-        async def _execute(session):
-            if not self._token:
-                await self.login(session=session)
-            path = f"/api/statistics/tests/{test_id}/measurements"
-            try:
-                return await self._request("GET", path, session=session)
-            except GreencellAuthError:
-                await self.login(session=session)
-                return await self._request("GET", path, session=session)
+        return await self._authed_request(
+            "GET",
+            f"/api/statistics/tests/{test_id}/measurements",
+            priority=PRIORITY_BACKGROUND,
+        )
+
+    async def iter_test_measurements(self, test_id: str) -> AsyncIterator[Measurement]:
+        """Yield a test run's measurements as compact tuples while the body downloads.
+
+        Only one element of the response and a bounded number of decoded
+        records are held at a time, however long the test ran.
+        """
+        parser = JsonArrayParser()
+        records: asyncio.Queue = asyncio.Queue(maxsize=MEASUREMENT_STREAM_BUFFER)
+        abandoned = False
 
-        return await self._with_session(_execute)
+        async def feed(chunk: bytes) -> None:
+            for record in parser.feed(chunk):
+                if abandoned:
+                    raise asyncio.CancelledError
+                await records.put(Measurement.from_record(record))
+
+        async def download() -> None:
+            try:
+                await self._authed_request(
+                    "GET",
+                    f"/api/statistics/tests/{test_id}/measurements",
+                    priority=PRIORITY_BACKGROUND,
+                    stream=feed,
+                )
+                try:
+                    parser.close()
+                except ValueError as err:
+                    raise GreencellResponseError("Invalid JSON stream") from err
+                _LOGGER.debug("Streamed %d measurements of test %s", parser.count, test_id)
+            finally:
+                await records.put(None)
+
+        downloader = asyncio.ensure_future(download())
+        try:
+            while (measurement := await records.get()) is not None:
+                yield measurement
+            await downloader
+        finally:
+            if not downloader.done():
+                # Stopped early: unblock the producer so it sees the flag and
+                # closes the response instead of waiting for a reader
+                abandoned = True
+                while not records.empty():
+                    records.get_nowait()
+                downloader.cancel()
+            # Retrieve the outcome so an abandoned failure is never logged as unhandled
+            await asyncio.gather(downloader, return_exceptions=True)
 
     async def fetch_statistics_events(self, limit: int = 1000):
         """Fetch event history."""
-        async def _execute(session):
-            if not self._token:
-                await self.login(session=session)
-            path = f"/api/statistics/events?limit={limit}"
-            try:
-                return await self._request("GET", path, session=session)
-            except GreencellAuthError:
-                await self.login(session=session)
-                return await self._request("GET", path, session=session)
+        return await self._authed_request(
+            "GET",
+            f"/api/statistics/events?limit={limit}",
+            priority=PRIORITY_BACKGROUND,
+        )
 
-        return await self._with_session(_execute)
+    async def iter_new_events(
+        self, cursor: EventCursor, page_size: int = EVENT_PAGE_SIZE
+    ) -> AsyncIterator[dict]:
+        """Yield events newer than ``cursor``, oldest first, and advance it.
+
+        The device returns the newest events first and only honours
+        ``limit``, so pages double in size until one reaches an event the
+        cursor has already seen, the log is exhausted or MAX_EVENT_PAGE is hit.
+        An empty cursor has nothing to page towards and reads the largest page
+        at once.
+        """
+        limit = MAX_EVENT_PAGE if cursor.newest is None else min(page_size, MAX_EVENT_PAGE)
+        while True:
+            events = await self.fetch_statistics_events(limit=limit) or []
+            fresh = [event for event in events if cursor.is_new(event)]
+            if len(fresh) < len(events) or len(events) < limit or limit >= MAX_EVENT_PAGE:
+                break
+            limit = min(limit * 2, MAX_EVENT_PAGE)
+        fresh.sort(key=lambda event: event_timestamp(event) or 0)
+        for event in fresh:
+            if cursor.is_new(event):  # the page may repeat an event
+                cursor.mark(event)
+                yield event
 
     async def fetch_schedules(self, visible: bool = True):
         """Fetch schedules."""
-        async def _execute(session):
-            if not self._token:
-                await self.login(session=session)
-            suffix = "?visible=true" if visible else ""
-            path = f"/api/scheduler/schedules{suffix}"
-            try:
-                return await self._request("GET", path, session=session)
-            except GreencellAuthError:
-                await self.login(session=session)
-                return await self._request("GET", path, session=session)
-
-        return await self._with_session(_execute)
+        suffix = "?visible=true" if visible else ""
+        return await self._authed_request(
+            "GET", f"/api/scheduler/schedules{suffix}", priority=PRIORITY_BACKGROUND
+        )
 
     async def delete_schedule(self, schedule_id: str):
         """Delete a schedule by id."""
-        async def _execute(session):
-            if not self._token:
-                await self.login(session=session)
-            path = f"/api/scheduler/schedules/{schedule_id}"
-            try:
-                return await self._request("DELETE", path, session=session)
-            except GreencellAuthError:
-                await self.login(session=session)
-                return await self._request("DELETE", path, session=session)
-
-        return await self._with_session(_execute)
+        return await self._authed_request(
+            "DELETE", f"/api/scheduler/schedules/{schedule_id}"
+        )
 
     async def fetch_smtp_settings(self):
         """Fetch SMTP settings."""
-        async def _execute(session):
-            if not self._token:
-                await self.login(session=session)
-            try:
-                return await self._request("GET", "/api/settings/smtp", session=session)
-            except GreencellAuthError:
-                await self.login(session=session)
-                return await self._request("GET", "/api/settings/smtp", session=session)
-
-        return await self._with_session(_execute)
+        return await self._authed_request(
+            "GET", "/api/settings/smtp", priority=PRIORITY_BACKGROUND
+        )
 
     async def update_smtp_settings(self, payload: dict):
         """Update SMTP settings."""
-        async def _execute(session):
-            if not self._token:
-                await self.login(session=session)
-            try:
-                return await self._request(
-                    "PUT", "/api/settings/smtp", json=payload, session=session
-                )
-            except GreencellAuthError:
-                await self.login(session=session)
-                return await self._request(
-                    "PUT", "/api/settings/smtp", json=payload, session=session
-                )
-
-        return await self._with_session(_execute)
+        return await self._authed_request("PUT", "/api/settings/smtp", json=payload)
 
     async def verify_smtp_settings(self, payload: dict):
         """Verify SMTP settings."""
-        async def _execute(session):
-            if not self._token:
-                await self.login(session=session)
-            try:
-                return await self._request(
-                    "POST", "/api/settings/smtp/verify", json=payload, session=session
-                )
-            except GreencellAuthError:
-                await self.login(session=session)
-                return await self._request(
-                    "POST", "/api/settings/smtp/verify", json=payload, session=session
-                )
-
-        return await self._with_session(_execute)
+        return await self._authed_request(
+            "POST", "/api/settings/smtp/verify", json=payload
+        )
 
     async def _send_command(self, action: str):
-        async def _execute(session):
-            if not self._token:
-                await self.login(session=session)
-
-            payload = {"action": action, "args": {}}
-            _LOGGER.debug("Sending command to /api/commands: action=%s", action)
-            try:
-                resp = await self._request(
-                    "POST",
-                    "/api/commands",
-                    json=payload,
-                    session=session,
-                    expect_json=False,
-                )
-                _LOGGER.debug(
-                    "Command action=%s succeeded with response=%s", action, resp
-                )
-                return resp
-            except GreencellAuthError:
-                await self.login(session=session)
-                return await self._request(
-                    "POST",
-                    "/api/commands",
-                    json=payload,
-                    session=session,
-                    expect_json=False,
-                )
+        payload = {"action": action, "args": {}}
+        _LOGGER.debug("Sending command to /api/commands: action=%s", action)
         try:
-            return await self._with_session(_execute)
+            resp = await self._authed_request(
+                "POST",
+                "/api/commands",
+                json=payload,
+                expect_json=False,
+                priority=PRIORITY_COMMAND,
+            )
         except GreencellApiError as err:
             _LOGGER.debug("Command %s failed at /api/commands: %s", action, err)
             raise
+        _LOGGER.debug("Command action=%s succeeded with response=%s", action, resp)
+        return resp
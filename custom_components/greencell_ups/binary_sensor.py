@@ -4,11 +4,12 @@ from typing import TYPE_CHECKING
 
 from homeassistant.components.binary_sensor import BinarySensorDeviceClass, BinarySensorEntity
 from homeassistant.const import CONF_HOST
-from homeassistant.helpers import device_registry as dr
+from homeassistant.core import callback
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, MANUFACTURER
+from .const import DOMAIN
+from .status import status_accessor
 
 if TYPE_CHECKING:
     from .coordinator import GreencellCoordinator
@@ -83,6 +84,7 @@ class GreencellBinarySensor(CoordinatorEntity["GreencellCoordinator"], BinarySen
     def __init__(self, coordinator, entry_id, host, key, sensor_config):
         super().__init__(coordinator)
         self._key = key
+        self._value = status_accessor(key)
         self._entry_id = entry_id
         self._host = host
         self._attr_name = sensor_config["name"]
@@ -92,23 +94,14 @@ class GreencellBinarySensor(CoordinatorEntity["GreencellCoordinator"], BinarySen
 
     @property
     def is_on(self):
-        data = self.coordinator.data or {}
-        return bool(data.get(self._key))
+        data = self.coordinator.data
+        return bool(self._value(data)) if data is not None else False
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        if self.coordinator.has_changed(self._key):
+            super()._handle_coordinator_update()
 
     @property
     def device_info(self) -> DeviceInfo:
-        spec = getattr(self.coordinator, "specification", None) or {}
-        model = spec.get("name") or (
-            ", ".join(spec["codes"]) if spec.get("codes") else None
-        )
-        connections = set()
-        if getattr(self.coordinator, "mac_address", None):
-            connections.add((dr.CONNECTION_NETWORK_MAC, self.coordinator.mac_address))
-        return DeviceInfo(
-            identifiers={(DOMAIN, self._entry_id)},
-            name=self.coordinator.device_name,
-            manufacturer=MANUFACTURER,
-            model=model,
-            connections=connections,
-            configuration_url=self.coordinator.configuration_url,
-        )
+        return self.coordinator.device_info
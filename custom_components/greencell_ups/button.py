@@ -3,16 +3,14 @@ from __future__ import annotations
 from homeassistant.components.button import ButtonEntity
 from homeassistant.const import CONF_HOST, EntityCategory
 from homeassistant.exceptions import HomeAssistantError
-from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.core import callback
 
-from .api import GreencellApiError
+from .api import COMMAND_ACTIONS, GreencellApiError
 from .coordinator import GreencellCoordinator
 from .const import (
     DOMAIN,
-    MANUFACTURER,
     SERVICE_CANCEL_TEST,
     SERVICE_LONG_TEST,
     SERVICE_SHORT_TEST,
@@ -57,23 +55,14 @@ class GreencellButton(CoordinatorEntity[GreencellCoordinator], ButtonEntity):
         self._attr_entity_category = button_conf.get("category")
         self._attr_unique_id = f"greencell_{entry_id}_btn_{button_conf['key']}"
 
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        if self.coordinator.has_changed():
+            super()._handle_coordinator_update()
+
     @property
     def device_info(self) -> DeviceInfo:
-        spec = getattr(self.coordinator, "specification", None) or {}
-        model = spec.get("name") or (
-            ", ".join(spec["codes"]) if spec.get("codes") else None
-        )
-        connections = set()
-        if getattr(self.coordinator, "mac_address", None):
-            connections.add((dr.CONNECTION_NETWORK_MAC, self.coordinator.mac_address))
-        return DeviceInfo(
-            identifiers={(DOMAIN, self._entry_id)},
-            name=self.coordinator.device_name,
-            manufacturer=MANUFACTURER,
-            model=model,
-            connections=connections,
-            configuration_url=self.coordinator.configuration_url,
-        )
+        return self.coordinator.device_info
 
     async def async_press(self) -> None:
         special = self._conf.get("special")
@@ -81,12 +70,16 @@ class GreencellButton(CoordinatorEntity[GreencellCoordinator], ButtonEntity):
             await self.coordinator.async_refresh_current_parameters()
             return
 
-        method = getattr(self.coordinator.api, self._conf.get("method", ""), None)
+        method_name = self._conf.get("method") or ""
+        method = getattr(self.coordinator.api, method_name, None)
         if method is None:
             raise HomeAssistantError(f"Command {self._conf['key']} not available")
+        before = self.coordinator.data
         try:
             await method()
-            await self.coordinator.async_refresh_current_parameters_with_delay(0.75)
+            self.coordinator.async_start_command_confirmation(
+                COMMAND_ACTIONS.get(method_name), before
+            )
         except GreencellApiError as err:
             self._log_activity(f"Command failed: {err}")
             raise HomeAssistantError(f"Command failed: {err}") from err
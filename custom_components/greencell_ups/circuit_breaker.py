@@ -0,0 +1,85 @@
+"""Circuit breaker that stops hammering a UPS that does not answer."""
+from __future__ import annotations
+
+import random
+import time
+from typing import Callable
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Fail fast after repeated transport failures, probing with backoff.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    calls are refused until the retry time. Then one probe is let through
+    (half-open): success closes the breaker, failure re-opens it with the delay
+    doubled (plus jitter) up to ``max_delay``.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        base_delay: float = 5.0,
+        max_delay: float = 300.0,
+        jitter: float = 0.2,
+        on_change: Callable[[], None] | None = None,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.on_change = on_change
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.trips = 0
+        self._delay = 0.0
+        self._retry_at = 0.0  # monotonic
+        self.next_retry: float | None = None  # epoch seconds while open
+
+    def retry_in(self) -> float:
+        """Seconds until the next probe is allowed (0 when not open)."""
+        if self.state != STATE_OPEN:
+            return 0.0
+        return max(self._retry_at - time.monotonic(), 0.0)
+
+    def allow(self) -> bool:
+        """Return True if a call may go to the device now."""
+        if self.state == STATE_CLOSED:
+            return True
+        if self.state == STATE_OPEN and time.monotonic() >= self._retry_at:
+            self._set_state(STATE_HALF_OPEN)
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._delay = 0.0
+        self.next_retry = None
+        if self.state != STATE_CLOSED:
+            self._set_state(STATE_CLOSED)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == STATE_HALF_OPEN or (
+            self.state == STATE_CLOSED and self.failures >= self.failure_threshold
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        self.trips += 1
+        self._delay = min(
+            self._delay * 2 if self._delay else self.base_delay, self.max_delay
+        )
+        delay = self._delay * (1 + random.uniform(0, self.jitter))
+        self._retry_at = time.monotonic() + delay
+        self.next_retry = time.time() + delay
+        self._set_state(STATE_OPEN)
+
+    def _set_state(self, state: str) -> None:
+        changed = state != self.state
+        self.state = state
+        if self.on_change is not None and (changed or state == STATE_OPEN):
+            self.on_change()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import logging
 from typing import Any
 
 import voluptuous as vol
@@ -21,11 +22,36 @@ from .api import (
     GreencellResponseError,
 )
 from .const import (
+    CONF_ADAPTIVE_POLLING,
+    CONF_FAST_SCAN_INTERVAL,
+    CONF_HEARTBEAT_INTERVAL,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_STATISTICS_INTERVAL,
+    CONF_STATISTICS_TIMEOUT,
+    CONF_STATUS_TIMEOUT,
+    CONF_MIN_PUBLISH_INTERVAL,
+    CONF_SENSOR_DEADBANDS,
+    CONF_SENSOR_MIN_INTERVALS,
+    CONF_SLOW_SCAN_INTERVAL,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_FAST_SCAN_INTERVAL,
+    DEFAULT_HEARTBEAT_INTERVAL,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_REQUEST_TIMEOUT,
+    DEFAULT_STATISTICS_INTERVAL,
+    DEFAULT_MIN_PUBLISH_INTERVAL,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SLOW_SCAN_INTERVAL,
     DEFAULT_VERIFY_SSL,
     DOMAIN,
+    MAX_CONCURRENT_REQUESTS,
+    MAX_REQUEST_TIMEOUT,
+    MIN_STATISTICS_INTERVAL,
+    MIN_FAST_SCAN_INTERVAL,
     MIN_SCAN_INTERVAL,
 )
+from .filters import format_deadband, parse_deadband
+from .sensor import SENSORS
 
 
 def _normalize_mac(mac: str | None) -> str | None:
@@ -74,6 +100,8 @@ class GreencellConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             except (GreencellRequestError, GreencellResponseError):
                 self._LOGGER.debug("Config flow: cannot connect to host=%s", host)
                 return self.async_abort(reason="cannot_connect")
+            finally:
+                await api.async_close()
 
         return self.async_show_form(
             step_id="user",
@@ -116,6 +144,7 @@ class GreencellOptionsFlowHandler(config_entries.OptionsFlow):
     def __init__(self, config_entry: config_entries.ConfigEntry):
         # Avoid assigning to read-only properties; keep our own reference
         self._config_entry = config_entry
+        self._options: dict[str, Any] = {}
 
     @property
     def config_entry(self) -> config_entries.ConfigEntry:
@@ -129,6 +158,13 @@ class GreencellOptionsFlowHandler(config_entries.OptionsFlow):
             options: dict[str, Any] = {
                 CONF_SCAN_INTERVAL: user_input[CONF_SCAN_INTERVAL],
                 CONF_VERIFY_SSL: user_input[CONF_VERIFY_SSL],
+                CONF_ADAPTIVE_POLLING: user_input[CONF_ADAPTIVE_POLLING],
+                CONF_FAST_SCAN_INTERVAL: user_input[CONF_FAST_SCAN_INTERVAL],
+                CONF_SLOW_SCAN_INTERVAL: user_input[CONF_SLOW_SCAN_INTERVAL],
+                CONF_MAX_CONCURRENT_REQUESTS: user_input[CONF_MAX_CONCURRENT_REQUESTS],
+                CONF_STATUS_TIMEOUT: user_input[CONF_STATUS_TIMEOUT],
+                CONF_STATISTICS_TIMEOUT: user_input[CONF_STATISTICS_TIMEOUT],
+                CONF_STATISTICS_INTERVAL: user_input[CONF_STATISTICS_INTERVAL],
             }
             mac = _normalize_mac(user_input.get(CONF_MAC))
             if mac:
@@ -136,7 +172,8 @@ class GreencellOptionsFlowHandler(config_entries.OptionsFlow):
             # Password is optional override; blank means no change/none
             if CONF_PASSWORD in user_input:
                 options[CONF_PASSWORD] = user_input[CONF_PASSWORD]
-            return self.async_create_entry(title="", data=options)
+            self._options = options
+            return await self.async_step_filters()
 
         current_interval = self.config_entry.options.get(
             CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL
@@ -145,6 +182,27 @@ class GreencellOptionsFlowHandler(config_entries.OptionsFlow):
             CONF_VERIFY_SSL,
             self.config_entry.data.get(CONF_VERIFY_SSL, DEFAULT_VERIFY_SSL),
         )
+        current_adaptive = self.config_entry.options.get(
+            CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING
+        )
+        current_fast_interval = self.config_entry.options.get(
+            CONF_FAST_SCAN_INTERVAL, DEFAULT_FAST_SCAN_INTERVAL
+        )
+        current_slow_interval = self.config_entry.options.get(
+            CONF_SLOW_SCAN_INTERVAL, DEFAULT_SLOW_SCAN_INTERVAL
+        )
+        current_max_requests = self.config_entry.options.get(
+            CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+        )
+        current_status_timeout = self.config_entry.options.get(
+            CONF_STATUS_TIMEOUT, DEFAULT_REQUEST_TIMEOUT
+        )
+        current_statistics_timeout = self.config_entry.options.get(
+            CONF_STATISTICS_TIMEOUT, DEFAULT_REQUEST_TIMEOUT
+        )
+        current_statistics_interval = self.config_entry.options.get(
+            CONF_STATISTICS_INTERVAL, DEFAULT_STATISTICS_INTERVAL
+        )
         current_mac = self.config_entry.options.get(
             CONF_MAC,
             self.config_entry.data.get(CONF_MAC, ""),
@@ -167,6 +225,51 @@ class GreencellOptionsFlowHandler(config_entries.OptionsFlow):
                     vol.Required(
                         CONF_VERIFY_SSL, default=current_verify_ssl
                     ): bool,
+                    vol.Required(
+                        CONF_ADAPTIVE_POLLING, default=current_adaptive
+                    ): bool,
+                    vol.Required(
+                        CONF_FAST_SCAN_INTERVAL,
+                        default=current_fast_interval,
+                    ): vol.All(
+                        vol.Coerce(int),
+                        vol.Range(min=MIN_FAST_SCAN_INTERVAL),
+                    ),
+                    vol.Required(
+                        CONF_SLOW_SCAN_INTERVAL,
+                        default=current_slow_interval,
+                    ): vol.All(
+                        vol.Coerce(int),
+                        vol.Range(min=MIN_SCAN_INTERVAL),
+                    ),
+                    vol.Required(
+                        CONF_MAX_CONCURRENT_REQUESTS,
+                        default=current_max_requests,
+                    ): vol.All(
+                        vol.Coerce(int),
+                        vol.Range(min=1, max=MAX_CONCURRENT_REQUESTS),
+                    ),
+                    vol.Required(
+                        CONF_STATUS_TIMEOUT,
+                        default=current_status_timeout,
+                    ): vol.All(
+                        vol.Coerce(int),
+                        vol.Range(min=0, max=MAX_REQUEST_TIMEOUT),
+                    ),
+                    vol.Required(
+                        CONF_STATISTICS_TIMEOUT,
+                        default=current_statistics_timeout,
+                    ): vol.All(
+                        vol.Coerce(int),
+                        vol.Range(min=0, max=MAX_REQUEST_TIMEOUT),
+                    ),
+                    vol.Required(
+                        CONF_STATISTICS_INTERVAL,
+                        default=current_statistics_interval,
+                    ): vol.All(
+                        vol.Coerce(int),
+                        vol.Range(min=MIN_STATISTICS_INTERVAL),
+                    ),
                     vol.Optional(
                         CONF_MAC,
                         default=current_mac,
@@ -186,3 +289,76 @@ class GreencellOptionsFlowHandler(config_entries.OptionsFlow):
                 }
             ),
         )
+
+    async def async_step_filters(self, user_input: dict[str, Any] | None = None):
+        """Tune per-sensor deadbands and publish intervals."""
+        filtered_keys = [
+            key
+            for key, sensor in SENSORS.items()
+            if "deadband" in sensor or "deadband_pct" in sensor
+        ]
+        current_deadbands = self.config_entry.options.get(CONF_SENSOR_DEADBANDS, {})
+        current_intervals = self.config_entry.options.get(CONF_SENSOR_MIN_INTERVALS, {})
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            deadbands: dict[str, str] = {}
+            intervals: dict[str, int] = {}
+            for key in filtered_keys:
+                value = user_input.get(f"{key}_deadband", "")
+                try:
+                    parse_deadband(value)
+                except ValueError:
+                    errors[f"{key}_deadband"] = "invalid_deadband"
+                    continue
+                deadbands[key] = str(value).strip()
+                interval = user_input.get(f"{key}_min_interval")
+                if interval is not None:
+                    intervals[key] = interval
+            if not errors:
+                self._options.update(
+                    {
+                        CONF_SENSOR_DEADBANDS: deadbands,
+                        CONF_SENSOR_MIN_INTERVALS: intervals,
+                        CONF_MIN_PUBLISH_INTERVAL: user_input[CONF_MIN_PUBLISH_INTERVAL],
+                        CONF_HEARTBEAT_INTERVAL: user_input[CONF_HEARTBEAT_INTERVAL],
+                    }
+                )
+                return self.async_create_entry(title="", data=self._options)
+
+        schema: dict[Any, Any] = {}
+        for key in filtered_keys:
+            default = current_deadbands.get(
+                key,
+                format_deadband(
+                    SENSORS[key].get("deadband"), SENSORS[key].get("deadband_pct")
+                ),
+            )
+            schema[vol.Optional(f"{key}_deadband", default=default)] = str
+            # Left empty, the sensor uses the global minimum publish interval below
+            schema[
+                vol.Optional(
+                    f"{key}_min_interval",
+                    description={"suggested_value": current_intervals.get(key)},
+                )
+            ] = vol.All(vol.Coerce(int), vol.Range(min=0))
+        schema[
+            vol.Required(
+                CONF_MIN_PUBLISH_INTERVAL,
+                default=self.config_entry.options.get(
+                    CONF_MIN_PUBLISH_INTERVAL, DEFAULT_MIN_PUBLISH_INTERVAL
+                ),
+            )
+        ] = vol.All(vol.Coerce(int), vol.Range(min=0))
+        schema[
+            vol.Required(
+                CONF_HEARTBEAT_INTERVAL,
+                default=self.config_entry.options.get(
+                    CONF_HEARTBEAT_INTERVAL, DEFAULT_HEARTBEAT_INTERVAL
+                ),
+            )
+        ] = vol.All(vol.Coerce(int), vol.Range(min=0))
+        return self.async_show_form(
+            step_id="filters",
+            data_schema=vol.Schema(schema),
+            errors=errors,
+        )
@@ -15,6 +15,84 @@ DEFAULT_SCAN_INTERVAL = 30  # seconds
 MIN_SCAN_INTERVAL = 5  # seconds
 DEFAULT_VERIFY_SSL = False
 
+# Polls allowed in flight per UPS; commands and background downloads each get
+# one extra slot, so at most this + 2 requests reach the device
+CONF_MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
+DEFAULT_MAX_CONCURRENT_REQUESTS = 1
+MAX_CONCURRENT_REQUESTS = 4
+
+# Request timeouts; 0 derives them from the measured round-trip latency
+CONF_STATUS_TIMEOUT = "status_timeout"
+CONF_STATISTICS_TIMEOUT = "statistics_timeout"
+DEFAULT_REQUEST_TIMEOUT = 0  # seconds, 0 = adaptive
+MAX_REQUEST_TIMEOUT = 120  # seconds
+
+# Adaptive polling: poll at the fast interval while the UPS needs attention and
+# back off towards the slow interval once it has been calm for a while.
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+CONF_FAST_SCAN_INTERVAL = "fast_scan_interval"
+CONF_SLOW_SCAN_INTERVAL = "slow_scan_interval"
+DEFAULT_ADAPTIVE_POLLING = False
+DEFAULT_FAST_SCAN_INTERVAL = 2  # seconds
+DEFAULT_SLOW_SCAN_INTERVAL = 120  # seconds
+MIN_FAST_SCAN_INTERVAL = 1  # seconds
+
+# Sensor publish filters: per-key deadbands ("0.5" absolute or "2%" relative),
+# a minimum interval between publishes and a heartbeat that republishes small
+# changes that stayed inside the deadband.
+CONF_SENSOR_DEADBANDS = "sensor_deadbands"
+CONF_SENSOR_MIN_INTERVALS = "sensor_min_intervals"  # per key; unset keys use the global one
+CONF_MIN_PUBLISH_INTERVAL = "min_publish_interval"
+CONF_HEARTBEAT_INTERVAL = "heartbeat_interval"
+DEFAULT_MIN_PUBLISH_INTERVAL = 0  # seconds
+DEFAULT_HEARTBEAT_INTERVAL = 900  # seconds
+
+# Domain-wide poll scheduler shared by all config entries (hass.data[DOMAIN])
+DATA_SCHEDULER = "scheduler"
+FLEET_MAX_CONCURRENT_POLLS = 4
+FLEET_POLL_JITTER = 0.05  # fraction of the poll interval
+
+# Statistics (tests, events, schedules) are refreshed by a second coordinator
+# that only runs while one of its entities is enabled.
+CONF_STATISTICS_INTERVAL = "statistics_interval"
+DEFAULT_STATISTICS_INTERVAL = 15  # minutes
+MIN_STATISTICS_INTERVAL = 1  # minutes
+RECENT_EVENTS = 50
+
+# Rolling in-memory history of numeric status values for derived sensors.
+# Samples are folded into fixed time buckets so the buffers cover the longest
+# window below at any poll interval.
+SAMPLE_HISTORY_KEYS = (
+    "inputVoltage",
+    "outputVoltage",
+    "inputFrequency",
+    "load",
+    "batteryVoltage",
+    "batteryLevel",
+    "temperature",
+)
+LOAD_AVERAGE_WINDOW = 15 * 60  # seconds
+BATTERY_TREND_WINDOW = 5 * 60  # seconds
+INPUT_VOLTAGE_RANGE_WINDOW = 60 * 60  # seconds
+SAMPLE_HISTORY_RESOLUTION = 5  # seconds per bucket
+SAMPLE_HISTORY_SIZE = INPUT_VOLTAGE_RANGE_WINDOW // SAMPLE_HISTORY_RESOLUTION + 1  # buckets
+
+# Outage capture: poll fast while on battery and keep the last samples in a
+# ring buffer; each finished outage is summarized and fired as an event.
+OUTAGE_POLL_INTERVAL = 1  # seconds
+OUTAGE_BUFFER_SIZE = 3600  # samples
+OUTAGE_HISTORY = 10  # records kept for diagnostics
+EVENT_OUTAGE = f"{DOMAIN}_outage"
+
+# Persisted test-history cache (homeassistant.helpers.storage)
+TEST_HISTORY_STORAGE_VERSION = 1
+TEST_HISTORY_STORAGE_KEY = DOMAIN + ".{entry_id}.test_history"
+EVENT_CURSOR_STORAGE_VERSION = 1
+EVENT_CURSOR_STORAGE_KEY = DOMAIN + ".{entry_id}.event_cursor"
+EVENT_CURSOR_SAVE_DELAY = 30  # seconds
+BATTERY_HEALTH_STORAGE_VERSION = 1
+BATTERY_HEALTH_STORAGE_KEY = DOMAIN + ".{entry_id}.battery_health"
+
 # Services
 SERVICE_TOGGLE_BEEPER = "toggle_beeper"
 SERVICE_SHUTDOWN = "shutdown"
@@ -1,10 +1,12 @@
 import asyncio
 import logging
-from datetime import timedelta
-from typing import Any
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.const import (
     CONF_HOST,
     CONF_MAC,
@@ -13,8 +15,10 @@ from homeassistant.const import (
     CONF_SCAN_INTERVAL,
     CONF_VERIFY_SSL,
 )
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.device_registry import format_mac
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
@@ -23,12 +27,81 @@ import socket
 from urllib.parse import urlparse
 
 from .const import (
+    BATTERY_HEALTH_STORAGE_KEY,
+    BATTERY_HEALTH_STORAGE_VERSION,
+    BATTERY_TREND_WINDOW,
+    CONF_ADAPTIVE_POLLING,
+    CONF_FAST_SCAN_INTERVAL,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_SLOW_SCAN_INTERVAL,
+    CONF_STATISTICS_INTERVAL,
+    CONF_STATISTICS_TIMEOUT,
+    CONF_STATUS_TIMEOUT,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_FAST_SCAN_INTERVAL,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_REQUEST_TIMEOUT,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SLOW_SCAN_INTERVAL,
+    DEFAULT_STATISTICS_INTERVAL,
     DEFAULT_VERIFY_SSL,
     DOMAIN,
+    EVENT_CURSOR_SAVE_DELAY,
+    EVENT_CURSOR_STORAGE_KEY,
+    EVENT_CURSOR_STORAGE_VERSION,
+    EVENT_OUTAGE,
+    INPUT_VOLTAGE_RANGE_WINDOW,
+    LOAD_AVERAGE_WINDOW,
+    MANUFACTURER,
+    MIN_FAST_SCAN_INTERVAL,
     MIN_SCAN_INTERVAL,
+    MIN_STATISTICS_INTERVAL,
+    OUTAGE_BUFFER_SIZE,
+    OUTAGE_HISTORY,
+    OUTAGE_POLL_INTERVAL,
+    RECENT_EVENTS,
+    SAMPLE_HISTORY_KEYS,
+    SAMPLE_HISTORY_RESOLUTION,
+    SAMPLE_HISTORY_SIZE,
+    TEST_HISTORY_STORAGE_KEY,
+    TEST_HISTORY_STORAGE_VERSION,
 )
+from .analytics import DischargeAnalysis, analyze_discharge
 from .api import GreencellApi, GreencellApiError
+from .outage import OutageRecord, OutageRecorder
+from .polling import (
+    COMMAND_EXPECTATIONS,
+    AdaptivePollPolicy,
+    CommandResult,
+    CommandTracker,
+    RequestCoalescer,
+)
+from .events import EventCursor
+from .health import BatteryHealth, TestSummary
+from .history import TestHistory
+from .runtime import RuntimeEstimator
+from .samples import SampleHistory
+from .status import UpsStatus, status_accessor
+
+STATUS_ENDPOINTS = ("/api/current_parameters",)
+STATISTICS_ENDPOINTS = (
+    "/api/statistics/tests",
+    "/api/statistics/tests/{id}/measurements",
+    "/api/statistics/events",
+)
+
+
+def _timeout_overrides(options) -> dict[str, float]:
+    """Map the configured timeouts onto endpoint templates (0 = adaptive)."""
+    overrides: dict[str, float] = {}
+    for option, endpoints in (
+        (CONF_STATUS_TIMEOUT, STATUS_ENDPOINTS),
+        (CONF_STATISTICS_TIMEOUT, STATISTICS_ENDPOINTS),
+    ):
+        seconds = options.get(option, DEFAULT_REQUEST_TIMEOUT)
+        if seconds:
+            overrides.update(dict.fromkeys(endpoints, float(seconds)))
+    return overrides
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -59,17 +132,71 @@ class GreencellCoordinator(DataUpdateCoordinator):
         self.api = GreencellApi(
             self.host,
             password,
-            session=async_get_clientsession(hass),
             verify_ssl=verify_ssl,
+            max_concurrent_requests=config_entry.options.get(
+                CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+            ),
+            timeout_overrides=_timeout_overrides(config_entry.options),
         )
         self.specification = None
+        self._device_info: DeviceInfo | None = None
+        self._device_info_key: tuple | None = None
+        self.poll_interval = timedelta(seconds=scan_interval)
+        # Keys whose value changed in the latest refresh; None means "everything"
+        self.changed_keys: frozenset[str] | None = None
+        self._notified_success: bool | None = None
+        self.api.breaker.on_change = self._async_breaker_changed
+        # Every status fetch (scheduled, manual, after commands) goes through here
+        self.status_requests = RequestCoalescer(hass.loop, self.api.fetch_status)
+        self._applied_payload: Any = None
+        self.last_command: CommandResult | None = None
+        self.commands = CommandTracker(hass.loop, self._async_fetch_for_confirmation)
+        self.runtime = RuntimeEstimator()
+        self.outage = OutageRecorder(OUTAGE_BUFFER_SIZE)
+        self.outages: deque[OutageRecord] = deque(maxlen=OUTAGE_HISTORY)
+        self.history = SampleHistory(
+            SAMPLE_HISTORY_SIZE,
+            {key: status_accessor(key) for key in SAMPLE_HISTORY_KEYS},
+            SAMPLE_HISTORY_RESOLUTION,
+        )
+        self.test_history: TestHistory | None = None
+        self._runtime_test: str | None = None
+        self._test_history_store = Store(
+            hass,
+            TEST_HISTORY_STORAGE_VERSION,
+            TEST_HISTORY_STORAGE_KEY.format(entry_id=config_entry.entry_id),
+        )
+        self._test_history_lock = asyncio.Lock()
+        self.event_cursor: EventCursor | None = None
+        self._event_cursor_store = Store(
+            hass,
+            EVENT_CURSOR_STORAGE_VERSION,
+            EVENT_CURSOR_STORAGE_KEY.format(entry_id=config_entry.entry_id),
+        )
+        self._events_lock = asyncio.Lock()
+        self._poll_policy = None
+        if config_entry.options.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING):
+            self._poll_policy = AdaptivePollPolicy(
+                base=scan_interval,
+                floor=max(
+                    config_entry.options.get(
+                        CONF_FAST_SCAN_INTERVAL, DEFAULT_FAST_SCAN_INTERVAL
+                    ),
+                    MIN_FAST_SCAN_INTERVAL,
+                ),
+                ceiling=config_entry.options.get(
+                    CONF_SLOW_SCAN_INTERVAL, DEFAULT_SLOW_SCAN_INTERVAL
+                ),
+            )
 
         super().__init__(
             hass,
             _LOGGER, 
             name=DOMAIN,
-            update_interval=timedelta(seconds=scan_interval),
+            # Polls are driven by the domain-wide FleetPollScheduler
+            update_interval=None,
         )
+        self.statistics = GreencellStatisticsCoordinator(hass, self)
 
     @property
     def _debug_enabled(self) -> bool:
@@ -84,9 +211,177 @@ class GreencellCoordinator(DataUpdateCoordinator):
             return self.host
         return f"http://{self.host}"
 
-    async def _async_update_data(self) -> dict[str, Any]:
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return the DeviceInfo shared by all entities of this UPS.
+
+        Rebuilt only when the specification, MAC address or name changed.
+        """
+        key = (id(self.specification), self.mac_address, self.device_name)
+        if self._device_info is None or key != self._device_info_key:
+            spec = self.specification or {}
+            model = spec.get("name") or (
+                ", ".join(spec["codes"]) if spec.get("codes") else None
+            )
+            connections = set()
+            if self.mac_address:
+                connections.add((dr.CONNECTION_NETWORK_MAC, self.mac_address))
+            self._device_info = DeviceInfo(
+                identifiers={(DOMAIN, self.config_entry.entry_id)},
+                name=self.device_name,
+                manufacturer=MANUFACTURER,
+                model=model,
+                connections=connections,
+                configuration_url=self.configuration_url,
+            )
+            self._device_info_key = key
+        return self._device_info
+
+    @property
+    def circuit_state(self) -> str:
+        return self.api.breaker.state
+
+    @property
+    def circuit_next_retry(self) -> datetime | None:
+        next_retry = self.api.breaker.next_retry
+        if next_retry is None:
+            return None
+        return datetime.fromtimestamp(next_retry, tz=timezone.utc)
+
+    @property
+    def status_latency(self) -> float | None:
+        """Mean status round trip in milliseconds."""
+        latency = self.api.metrics.endpoint(STATUS_ENDPOINTS[0]).mean_latency
+        return round(latency * 1000, 1) if latency is not None else None
+
+    @property
+    def status_decode_time(self) -> float | None:
+        """Time spent decoding the last status payload in milliseconds."""
+        decode = self.api.metrics.endpoint(STATUS_ENDPOINTS[0]).last_decode_time
+        return round(decode * 1000, 2) if decode is not None else None
+
+    @property
+    def status_response_bytes(self) -> int | None:
+        return self.api.metrics.endpoint(STATUS_ENDPOINTS[0]).last_response_bytes
+
+    @property
+    def runtime_remaining(self) -> float | None:
+        """Estimated minutes left on battery at the current load."""
+        remaining = self.runtime.remaining
+        return round(remaining / 60, 1) if remaining is not None else None
+
+    @property
+    def load_average(self) -> float | None:
+        mean = self.history.stats("load", LOAD_AVERAGE_WINDOW).mean
+        return round(mean, 1) if mean is not None else None
+
+    @property
+    def battery_voltage_trend(self) -> float | None:
+        """Battery voltage change in volts per minute."""
+        rate = self.history.stats("batteryVoltage", BATTERY_TREND_WINDOW).rate
+        return round(rate, 3) if rate is not None else None
+
+    @property
+    def input_voltage_min(self) -> float | None:
+        return self.history.stats("inputVoltage", INPUT_VOLTAGE_RANGE_WINDOW).minimum
+
+    @property
+    def input_voltage_max(self) -> float | None:
+        return self.history.stats("inputVoltage", INPUT_VOLTAGE_RANGE_WINDOW).maximum
+
+    def history_coverage(self, key: str, window: float) -> dict[str, float]:
+        """Window of a derived sensor and how much of it the history covers so far."""
+        return {"window": window, "covered": round(min(self.history.span(key), window))}
+
+    @property
+    def request_errors(self) -> int:
+        return sum(stats.error_count for stats in self.api.metrics.endpoints.values())
+
+    @property
+    def login_count(self) -> int:
+        return self.api.login_count
+
+    def next_poll_interval(self) -> float:
+        """Seconds until the next poll; stretched while the UPS is unreachable."""
+        interval = self.poll_interval.total_seconds()
+        if self.outage.active:
+            interval = min(interval, OUTAGE_POLL_INTERVAL)
+        return max(interval, self.api.breaker.retry_in())
+
+    @callback
+    def _async_breaker_changed(self) -> None:
+        self.changed_keys = frozenset({"circuitState", "circuitNextRetry"})
+        self.async_update_listeners()
+
+    async def _async_update_data(self) -> UpsStatus:
+        mac_before = self.mac_address
+        payload = await self._async_fetch_data()
+        data = self._parse_status(payload)
+        self._applied_payload = payload
+        self._observe(data)
+        self._track_changes(data, mac_before)
+        return data
+
+    def _observe(self, data: UpsStatus) -> None:
+        """Feed a new status sample to the history, runtime estimator and outage capture."""
+        now = time.monotonic()
+        self.history.append(data, now)
+        self.runtime.update(data, now)
+        was_active = self.outage.active
+        record = self.outage.update(
+            data, time.time(), (self.specification or {}).get("power")
+        )
+        if self.outage.active and not was_active:
+            _LOGGER.info("Mains outage on %s; capturing at %ss", self.host, OUTAGE_POLL_INTERVAL)
+        if record is not None:
+            self.outages.append(record)
+            _LOGGER.info(
+                "Mains restored on %s after %.0fs (min battery %s V)",
+                self.host,
+                record.duration,
+                record.min_battery_voltage,
+            )
+            self.hass.bus.async_fire(
+                EVENT_OUTAGE,
+                {"entry_id": self.config_entry.entry_id, **record.as_dict()},
+            )
+
+    @staticmethod
+    def _parse_status(payload: Any) -> UpsStatus:
+        if not isinstance(payload, dict):
+            raise UpdateFailed(f"Unexpected current_parameters payload: {payload!r}")
+        return UpsStatus.from_payload(payload)
+
+    def _track_changes(self, data: UpsStatus, mac_before: str | None) -> None:
+        """Record which status keys differ from the data entities last saw."""
+        if self.data is None:
+            self.changed_keys = None
+            return
+        changed = set(data.diff(self.data))
+        if self.mac_address != mac_before:
+            changed.add("macAddress")
+        self.changed_keys = frozenset(changed)
+
+    def has_changed(self, *keys: str) -> bool:
+        """Return True when an entity reading ``keys`` needs to write its state."""
+        return self.changed_keys is None or not self.changed_keys.isdisjoint(keys)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        if self.last_update_success != self._notified_success:
+            # Availability flipped: every entity must write its state
+            self.changed_keys = None
+            self._notified_success = self.last_update_success
+        super().async_update_listeners()
+        self.changed_keys = frozenset()
+
+    async def _async_fetch_data(self) -> dict[str, Any]:
         try:
-            data = await self.api.fetch_status()
+            data = await self.status_requests.fetch()
+            if self._poll_policy is not None:
+                self.poll_interval = timedelta(
+                    seconds=self._poll_policy.update(data)
+                )
             if self.mac_address is None:
                 self.mac_address = self._normalize_mac(self._extract_mac(data))
             if self.mac_address is None:
@@ -218,19 +513,235 @@ class GreencellCoordinator(DataUpdateCoordinator):
             return str(name)
         return self.device_name
 
+    async def async_shutdown(self) -> None:
+        """Stop polling and release the UPS connection pool."""
+        self.commands.close()
+        await self.statistics.async_shutdown()
+        await super().async_shutdown()
+        await self.api.async_close()
+
+    async def async_sync_test_history(self) -> list[str]:
+        """Sync the cached test history; return ids of newly completed tests.
+
+        Only new or still-running tests are downloaded; completed ones come
+        from the store.
+        """
+        async with self._test_history_lock:
+            await self._async_load_test_history()
+            newly_completed = await self.test_history.async_sync(self.api)
+            if self.test_history.dirty:
+                self.test_history.dirty = False
+                await self._test_history_store.async_save(self.test_history.as_dict())
+            self._learn_runtime()
+            return newly_completed
+
+    async def async_load_test_history(self) -> None:
+        """Load the cached test history and seed the runtime estimator from it.
+
+        Called once at setup so the estimate has a measured discharge rate
+        even when the statistics coordinator never runs.
+        """
+        async with self._test_history_lock:
+            await self._async_load_test_history()
+            self._learn_runtime()
+
+    async def _async_load_test_history(self) -> None:
+        if self.test_history is None:
+            self.test_history = TestHistory(await self._test_history_store.async_load())
+
+    def _learn_runtime(self) -> None:
+        """Teach the runtime estimator the discharge rate of the newest long test."""
+        last_long = next(
+            (
+                entry
+                for entry in self.test_history.tests()
+                if entry.test.get("date_end")
+                and (entry.test.get("command") or {}).get("action") == "longTestOrder"
+            ),
+            None,
+        )
+        if last_long is None or last_long.test.get("id") == self._runtime_test:
+            return
+        self._runtime_test = last_long.test.get("id")
+        self.runtime.learn_from_test(last_long.measurements)
+
+    async def async_fetch_new_events(self) -> list[dict]:
+        """Return events logged since the previous call, oldest first."""
+        async with self._events_lock:
+            if self.event_cursor is None:
+                self.event_cursor = EventCursor.from_dict(
+                    await self._event_cursor_store.async_load()
+                )
+            events = [event async for event in self.api.iter_new_events(self.event_cursor)]
+            if events:
+                self._event_cursor_store.async_delay_save(
+                    self.event_cursor.as_dict, EVENT_CURSOR_SAVE_DELAY
+                )
+            return events
+
     async def async_refresh_current_parameters(self) -> None:
         """Fetch current parameters immediately and update coordinator data."""
-        return await self.async_refresh_current_parameters_with_delay()
+        await self._async_apply_status(self.status_requests.fetch(fresh=True))
+
+    async def _async_fetch_for_confirmation(self) -> UpsStatus | None:
+        await self.async_refresh_current_parameters()
+        return self.data
 
-    async def async_refresh_current_parameters_with_delay(
-        self, delay: float = 0.0
+    @callback
+    def async_start_command_confirmation(
+        self, action: str | None, before: UpsStatus | None
     ) -> None:
-        """Fetch current parameters with an optional delay to allow device state to settle."""
-        if delay > 0:
-            await asyncio.sleep(delay)
+        """Confirm ``action`` in a task owned by the config entry.
+
+        The entry cancels it on unload, so no confirmation outlives the
+        session it polls through.
+        """
+        self.config_entry.async_create_background_task(
+            self.hass,
+            self.async_confirm_command(action, before),
+            f"{DOMAIN} confirm {action} {self.host}",
+        )
+
+    async def async_confirm_command(
+        self, action: str | None, before: UpsStatus | None
+    ) -> None:
+        """Poll until the UPS reflects ``action``.
+
+        Entities start this through ``async_start_command_confirmation`` so a
+        service call returns as soon as the UPS accepted the command. All pending commands share the
+        polls of one tracker, so a burst of commands is confirmed together.
+        """
+        if action not in COMMAND_EXPECTATIONS:
+            await self.async_refresh_current_parameters()
+            return
+
+        result = await self.commands.wait(action, before)
+        self.last_command = result
+        if self._debug_enabled:
+            _LOGGER.debug(
+                "Command %s %s after %.2fs (%d polls)",
+                action,
+                "confirmed" if result.confirmed else "not confirmed",
+                result.elapsed,
+                result.polls,
+            )
+
+    async def _async_apply_status(self, request: Awaitable[Any]) -> None:
         try:
-            data = await self.api.fetch_status()
-            self.async_set_updated_data(data)
-        except GreencellApiError as err:
+            payload = await request
+            if payload is self._applied_payload:
+                # Another caller sharing this request already applied it
+                return
+            data = self._parse_status(payload)
+        except (GreencellApiError, UpdateFailed) as err:
             if self._debug_enabled:
                 _LOGGER.debug("Manual refresh of current parameters failed: %s", err)
+            return
+        self._applied_payload = payload
+        self._observe(data)
+        self._track_changes(data, self.mac_address)
+        self.async_set_updated_data(data)
+
+
+class GreencellStatisticsCoordinator(DataUpdateCoordinator):
+    """Slow refresh of test history, events and schedules.
+
+    DataUpdateCoordinator only schedules refreshes while listeners exist, so
+    nothing is fetched unless a statistics entity is enabled. All requests run
+    in the background lane of the shared request queue, so a download never
+    occupies the slot a status poll needs.
+    """
+
+    def __init__(self, hass: HomeAssistant, status: GreencellCoordinator) -> None:
+        self.status = status
+        self.recent_events: deque[dict] = deque(maxlen=RECENT_EVENTS)
+        self._analysis: tuple[str, DischargeAnalysis | None] | None = None
+        self.health: BatteryHealth | None = None
+        self._health_store = Store(
+            hass,
+            BATTERY_HEALTH_STORAGE_VERSION,
+            BATTERY_HEALTH_STORAGE_KEY.format(entry_id=status.config_entry.entry_id),
+        )
+        interval = max(
+            status.config_entry.options.get(
+                CONF_STATISTICS_INTERVAL, DEFAULT_STATISTICS_INTERVAL
+            ),
+            MIN_STATISTICS_INTERVAL,
+        )
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN}_statistics",
+            update_interval=timedelta(minutes=interval),
+        )
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return self.status.device_info
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        try:
+            new_tests = await self.status.async_sync_test_history()
+            self.recent_events.extend(await self.status.async_fetch_new_events())
+            schedules = await self.status.api.fetch_schedules()
+        except GreencellApiError as err:
+            raise UpdateFailed(err) from err
+        history = self.status.test_history
+        tests = [entry.test for entry in history.tests()] if history else []
+        last_completed = next((test for test in tests if test.get("date_end")), None)
+        analysis = await self._async_analyze(last_completed) if last_completed else None
+        await self._async_update_health(new_tests)
+        return {
+            "tests": tests,
+            "new_tests": new_tests,
+            "last_completed_test": last_completed,
+            "last_test_analysis": analysis.as_dict() if analysis else None,
+            "events": list(self.recent_events),
+            "schedules": schedules if isinstance(schedules, list) else [],
+            "battery_health": self.health.score,
+            "degradation_rate": self.health.degradation_rate,
+            "health_tests": self.health.count,
+            "health_by_kind": self.health.by_kind(),
+        }
+
+    async def _async_update_health(self, new_tests: list[str]) -> None:
+        """Fold newly completed tests into the persisted battery-health model."""
+        history = self.status.test_history
+        if self.health is None:
+            self.health = BatteryHealth(await self._health_store.async_load())
+            # Catch up on tests cached before the model existed
+            new_tests = list(history.completed)
+        entries = [
+            history.completed[test_id]
+            for test_id in new_tests
+            if test_id in history.completed and test_id not in self.health.folded
+        ]
+        changed = False
+        for entry in sorted(entries, key=lambda entry: entry.test.get("date_end") or 0):
+            summary = TestSummary.from_test(entry.test, entry.measurements)
+            if summary is not None:
+                changed = self.health.fold(summary) or changed
+        if changed:
+            await self._health_store.async_save(self.health.as_dict())
+
+    async def _async_analyze(self, test: dict) -> DischargeAnalysis | None:
+        """Analyze a completed test once, off the event loop."""
+        test_id = test.get("id")
+        if self._analysis is not None and self._analysis[0] == test_id:
+            return self._analysis[1]
+        entry = self.status.test_history.get(test_id)
+        if entry is None:
+            return None
+        spec = self.status.specification or {}
+        nominal_voltage = None
+        if spec.get("batteryVoltage"):
+            nominal_voltage = spec["batteryVoltage"] * (spec.get("batteryNumber") or 1)
+        analysis = await self.hass.async_add_executor_job(
+            analyze_discharge,
+            entry.measurements,
+            test.get("battery_voltage_low_nominal"),
+            spec.get("power"),
+            nominal_voltage,
+        )
+        self._analysis = (test_id, analysis)
+        return analysis
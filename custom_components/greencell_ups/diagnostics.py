@@ -6,7 +6,7 @@ from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers import redact
 
-from .const import DOMAIN
+from .const import DATA_SCHEDULER, DOMAIN
 
 TO_REDACT = {
     "password",
@@ -19,6 +19,7 @@ async def async_get_config_entry_diagnostics(
     entry: ConfigEntry,
 ) -> dict[str, Any]:
     coordinator = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    scheduler = hass.data.get(DOMAIN, {}).get(DATA_SCHEDULER)
 
     def _safe_redact(value: Any) -> Any:
         try:
@@ -28,7 +29,7 @@ async def async_get_config_entry_diagnostics(
 
     def _safe_interval_seconds(coordinator_obj: Any) -> float | None:
         try:
-            interval = getattr(coordinator_obj, "update_interval", None)
+            interval = getattr(coordinator_obj, "poll_interval", None)
             return interval.total_seconds() if interval else None
         except Exception:
             return None
@@ -42,7 +43,7 @@ async def async_get_config_entry_diagnostics(
     coordinator_data = None
     specification = None
     try:
-        coordinator_data = coordinator.data if coordinator else None
+        coordinator_data = coordinator.data.as_dict() if coordinator and coordinator.data else None
     except Exception:
         coordinator_data = None
     try:
@@ -62,7 +63,72 @@ async def async_get_config_entry_diagnostics(
         "coordinator": {
             "last_update_success": _safe_bool("last_update_success"),
             "update_interval": _safe_interval_seconds(coordinator),
+            "scheduling_lag": scheduler.lag(entry.entry_id) if scheduler else None,
             "mac_address": getattr(coordinator, "mac_address", None) if coordinator else None,
+            "status_requests": {
+                "calls": coordinator.status_requests.calls,
+                "joined": coordinator.status_requests.joined,
+            } if coordinator else None,
+            "circuit_breaker": {
+                "state": coordinator.api.breaker.state,
+                "failures": coordinator.api.breaker.failures,
+                "trips": coordinator.api.breaker.trips,
+                "retry_in": coordinator.api.breaker.retry_in(),
+            } if coordinator else None,
+            "request_queue": {
+                "limit": coordinator.api.queue.limit,
+                "pending": coordinator.api.queue.pending,
+                "dropped": coordinator.api.queue.dropped,
+            } if coordinator else None,
+            "request_timeouts": {
+                endpoint: {
+                    "p50": coordinator.api.latency.percentile(endpoint, 0.5),
+                    "p99": coordinator.api.latency.percentile(endpoint, 0.99),
+                    "timeout": coordinator.api.latency.timeout_for(endpoint),
+                    "timeouts": coordinator.api.latency.timeouts.get(endpoint, 0),
+                }
+                for endpoint in coordinator.api.latency.endpoints
+            } if coordinator else None,
+            "request_metrics": {
+                **coordinator.api.metrics.as_dict(),
+                "logins": coordinator.api.login_count,
+                "connections_created": coordinator.api.connections_created,
+                "connections_reused": coordinator.api.connections_reused,
+            } if coordinator else None,
+            "test_history": {
+                "completed": len(coordinator.test_history.completed),
+                "running": len(coordinator.test_history.running),
+                "downloads": coordinator.test_history.downloads,
+            } if coordinator and coordinator.test_history else None,
+            "event_cursor": {
+                "newest": coordinator.event_cursor.newest,
+                "seen_ids": len(coordinator.event_cursor),
+            } if coordinator and coordinator.event_cursor else None,
+            "statistics": {
+                "last_update_success": coordinator.statistics.last_update_success,
+                "update_interval": coordinator.statistics.update_interval.total_seconds(),
+                "data": _safe_redact(coordinator.statistics.data),
+            } if coordinator else None,
+            "sample_history": {
+                key: coordinator.history.stats(key)._asdict()
+                for key in coordinator.history.keys
+            } if coordinator else None,
+            "command_tracker": {
+                "pending": coordinator.commands.pending,
+                "polls": coordinator.commands.polls,
+            } if coordinator else None,
+            "outage": {
+                "active": coordinator.outage.active,
+                "samples": coordinator.outage.samples,
+                "buffered": len(coordinator.outage.buffer),
+                # Samples of the ongoing outage, or of the last one until the next starts
+                "captured": list(coordinator.outage.buffer.rows()),
+                "records": [record.as_dict() for record in coordinator.outages],
+            } if coordinator else None,
+            "last_command": coordinator.last_command._asdict()
+            if coordinator and coordinator.last_command
+            else None,
+            "endpoint_capabilities": dict(coordinator.api.capabilities) if coordinator else None,
         },
         "data": _safe_redact(coordinator_data),
         "specification": _safe_redact(specification),
@@ -0,0 +1,68 @@
+"""Cursor for incremental reads of the UPS event log."""
+from __future__ import annotations
+
+import json
+from collections import OrderedDict
+from typing import Any
+
+# The endpoint only supports ``limit``: pages start small and double until they
+# reach an already-seen event, so a sync costs about twice the new events.
+EVENT_PAGE_SIZE = 50
+MAX_EVENT_PAGE = 1000
+SEEN_EVENT_IDS = 2048
+
+
+def event_timestamp(event: dict[str, Any]) -> int | float | None:
+    for key in ("timestamp", "date", "time"):
+        value = event.get(key)
+        if isinstance(value, (int, float)):
+            return value
+    return None
+
+
+def event_id(event: dict[str, Any]) -> str:
+    identifier = event.get("id") or event.get("_id")
+    if identifier:
+        return str(identifier)
+    # No id on this firmware: the record itself identifies the event
+    return json.dumps(event, sort_keys=True, default=str)
+
+
+class EventCursor:
+    """Newest event timestamp seen plus a bounded LRU of seen event ids.
+
+    Events older than the cursor are never new; events sharing its timestamp
+    are told apart by id.
+    """
+
+    def __init__(self, newest: int | float | None = None, seen: list[str] | None = None) -> None:
+        self.newest = newest
+        self._seen: OrderedDict[str, None] = OrderedDict.fromkeys(seen or ())
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def is_new(self, event: dict[str, Any]) -> bool:
+        identifier = event_id(event)
+        if identifier in self._seen:
+            self._seen.move_to_end(identifier)
+            return False
+        timestamp = event_timestamp(event)
+        return self.newest is None or timestamp is None or timestamp >= self.newest
+
+    def mark(self, event: dict[str, Any]) -> None:
+        self._seen[event_id(event)] = None
+        self._seen.move_to_end(event_id(event))
+        while len(self._seen) > SEEN_EVENT_IDS:
+            self._seen.popitem(last=False)
+        timestamp = event_timestamp(event)
+        if timestamp is not None and (self.newest is None or timestamp > self.newest):
+            self.newest = timestamp
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"newest": self.newest, "seen": list(self._seen)}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | None) -> EventCursor:
+        data = data or {}
+        return cls(data.get("newest"), data.get("seen"))
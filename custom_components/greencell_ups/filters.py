@@ -0,0 +1,87 @@
+"""Publish filters that keep sensor noise out of the recorder."""
+from __future__ import annotations
+
+from typing import Any
+
+_UNSET = object()
+
+
+def parse_deadband(text: Any) -> tuple[float | None, float | None]:
+    """Parse "0.5" (absolute) or "2%" (relative) into (absolute, percent)."""
+    if text is None:
+        return None, None
+    text = str(text).strip()
+    if not text:
+        return None, None
+    if text.endswith("%"):
+        return None, abs(float(text[:-1]))
+    return abs(float(text)), None
+
+
+def format_deadband(absolute: float | None, percent: float | None) -> str:
+    if percent is not None:
+        return f"{percent:g}%"
+    if absolute is not None:
+        return f"{absolute:g}"
+    return ""
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class SensorFilter:
+    """Decide whether a new reading differs enough from the last published one.
+
+    Numeric readings are published when they move by more than the deadband
+    (absolute, or percent of the last published value) and at least
+    ``min_interval`` seconds have passed. A changed reading inside the deadband
+    is still published once ``heartbeat`` seconds have passed since the last
+    publish. Non-numeric changes are always published.
+    """
+
+    __slots__ = ("deadband", "deadband_pct", "min_interval", "heartbeat", "value", "_published_at")
+
+    def __init__(
+        self,
+        deadband: float | None = None,
+        deadband_pct: float | None = None,
+        min_interval: float = 0.0,
+        heartbeat: float | None = None,
+    ) -> None:
+        self.deadband = deadband
+        self.deadband_pct = deadband_pct
+        self.min_interval = min_interval
+        self.heartbeat = heartbeat
+        self.value: Any = _UNSET
+        self._published_at = 0.0
+
+    @property
+    def has_value(self) -> bool:
+        return self.value is not _UNSET
+
+    def _significant(self, value: float) -> bool:
+        threshold = self.deadband or 0.0
+        if self.deadband_pct:
+            threshold = max(threshold, abs(self.value) * self.deadband_pct / 100)
+        return abs(value - self.value) > threshold
+
+    def offer(self, value: Any, now: float) -> bool:
+        """Offer a reading; return True (and remember it) when it should be published."""
+        if self.value is _UNSET:
+            publish = True
+        elif value == self.value:
+            return False
+        elif not (_is_number(value) and _is_number(self.value)):
+            publish = True
+        else:
+            elapsed = now - self._published_at
+            if elapsed < self.min_interval:
+                return False
+            publish = self._significant(value) or (
+                self.heartbeat is not None and elapsed >= self.heartbeat
+            )
+        if publish:
+            self.value = value
+            self._published_at = now
+        return publish
@@ -0,0 +1,206 @@
+"""Battery health trend built from completed self-tests, one test at a time."""
+from __future__ import annotations
+
+from typing import Any, Iterable, NamedTuple
+
+from .measurements import Measurement
+
+# Weight of the newest test in the smoothed health score
+HEALTH_SMOOTHING = 0.3
+# Per-test summaries kept for inspection; the trend itself lives in running sums
+MAX_TEST_SUMMARIES = 200
+SECONDS_PER_YEAR = 365.25 * 24 * 3600
+# Fewer tests than this, or a shorter span, gives no meaningful degradation rate
+MIN_TREND_TESTS = 3
+MIN_TREND_SPAN = 7 * 24 * 3600  # seconds
+
+TEST_KINDS = {"shortTestOrder": "short", "longTestOrder": "long"}
+# Kind whose score headlines the model when present: only a long test drains
+# enough charge to show lost capacity
+PRIMARY_KINDS = ("long", "short", "other")
+# Floors that keep a near-idle UPS from dividing by (almost) zero
+MIN_LOAD_FRACTION = 0.05
+MIN_SAG = 0.05  # volts, about the resolution of the reported voltage
+
+
+class TestSummary(NamedTuple):
+    """Compact features of one completed test."""
+
+    __test__ = False  # not a pytest test class
+
+    test_id: str
+    kind: str
+    ended_at: int  # epoch milliseconds
+    duration: float  # seconds
+    start_voltage: float
+    min_voltage: float
+    mean_load: float | None  # percent of rated load
+
+    @classmethod
+    def from_test(
+        cls, test: dict[str, Any], measurements: Iterable[Measurement]
+    ) -> TestSummary | None:
+        voltages: list[float] = []
+        loads: list[float] = []
+        for measurement in measurements:
+            if measurement.battery_voltage is not None:
+                voltages.append(measurement.battery_voltage)
+            if measurement.load is not None:
+                loads.append(measurement.load)
+        if not voltages:
+            return None
+        return cls(
+            test["id"],
+            TEST_KINDS.get((test.get("command") or {}).get("action"), "other"),
+            test.get("date_end") or 0,
+            max((test.get("date_end") or 0) - (test.get("date_start") or 0), 0) / 1000.0,
+            voltages[0],
+            min(voltages),
+            sum(loads) / len(loads) if loads else None,
+        )
+
+    @property
+    def load_fraction(self) -> float:
+        if self.mean_load is None:
+            return 1.0
+        return max(self.mean_load / 100.0, MIN_LOAD_FRACTION)
+
+    @property
+    def metric(self) -> float:
+        """Load-normalized test result; see :meth:`KindTrend.health`.
+
+        A long test yields its full-load-equivalent runtime in seconds (higher
+        is better); any other test yields its voltage sag per unit of load,
+        i.e. volts at full load (lower is better).
+        """
+        if self.kind == "long":
+            return self.duration * self.load_fraction
+        return max(self.start_voltage - self.min_voltage, MIN_SAG) / self.load_fraction
+
+
+class KindTrend:
+    """Score and least-squares trend over the tests of one kind."""
+
+    def __init__(self, data: dict[str, Any] | None = None) -> None:
+        data = data or {}
+        self.reference: float | None = data.get("reference")
+        self.score: float | None = data.get("score")
+        self.count = data.get("count", 0)
+        self.first_at: float | None = data.get("first_at")
+        self.last_at: float | None = data.get("last_at")
+        # Running sums over (t, h) with t in seconds since ``first_at``
+        self._sums: list[float] = list(data.get("sums", (0.0, 0.0, 0.0, 0.0)))
+
+    def health(self, summary: TestSummary) -> float:
+        """Percent of the first test of this kind; 100 = no worse than then."""
+        metric = summary.metric
+        if summary.kind == "long":
+            ratio = metric / self.reference if self.reference else 0.0
+        else:
+            ratio = self.reference / metric
+        return round(max(ratio, 0.0) * 100.0, 2)
+
+    def fold(self, summary: TestSummary) -> None:
+        if self.reference is None:
+            self.reference = summary.metric
+        health = self.health(summary)
+        ended = summary.ended_at / 1000.0
+        if self.first_at is None:
+            self.first_at = ended
+        self.last_at = ended if self.last_at is None else max(self.last_at, ended)
+        t = ended - self.first_at
+        sum_t, sum_h, sum_tt, sum_th = self._sums
+        self._sums = [sum_t + t, sum_h + health, sum_tt + t * t, sum_th + t * health]
+        self.count += 1
+        self.score = (
+            health
+            if self.score is None
+            else HEALTH_SMOOTHING * health + (1 - HEALTH_SMOOTHING) * self.score
+        )
+
+    @property
+    def degradation_rate(self) -> float | None:
+        """Health lost per year in percentage points (positive = ageing)."""
+        if self.count < MIN_TREND_TESTS or (self.last_at - self.first_at) < MIN_TREND_SPAN:
+            return None
+        sum_t, sum_h, sum_tt, sum_th = self._sums
+        denominator = self.count * sum_tt - sum_t * sum_t
+        if denominator <= 0:
+            return None
+        slope = (self.count * sum_th - sum_t * sum_h) / denominator
+        return round(-slope * SECONDS_PER_YEAR, 2)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "reference": self.reference,
+            "score": self.score,
+            "count": self.count,
+            "first_at": self.first_at,
+            "last_at": self.last_at,
+            "sums": self._sums,
+        }
+
+
+class BatteryHealth:
+    """Fold each completed test in exactly once and keep the trend in O(1).
+
+    Short and long tests stress the battery very differently, so each kind
+    keeps its own :class:`KindTrend` and is only ever compared with itself.
+    The headline score and degradation rate come from the first kind in
+    ``PRIMARY_KINDS`` that has been seen.
+    """
+
+    def __init__(self, data: dict[str, Any] | None = None) -> None:
+        data = data or {}
+        if "kinds" not in data:
+            # Stored by the single-trend model; start over so every cached
+            # test is folded again under the per-kind model
+            data = {}
+        self.folded: set[str] = set(data.get("folded", ()))
+        self.summaries: list[TestSummary] = [TestSummary(*row) for row in data.get("summaries", ())]
+        self.kinds: dict[str, KindTrend] = {
+            kind: KindTrend(trend) for kind, trend in data.get("kinds", {}).items()
+        }
+
+    def fold(self, summary: TestSummary) -> bool:
+        """Add one test; return False when it was already folded in."""
+        if summary.test_id in self.folded:
+            return False
+        self.folded.add(summary.test_id)
+        self.kinds.setdefault(summary.kind, KindTrend()).fold(summary)
+        self.summaries.append(summary)
+        del self.summaries[:-MAX_TEST_SUMMARIES]
+        return True
+
+    @property
+    def primary(self) -> KindTrend | None:
+        return next((self.kinds[kind] for kind in PRIMARY_KINDS if kind in self.kinds), None)
+
+    @property
+    def score(self) -> float | None:
+        return self.primary.score if self.primary else None
+
+    @property
+    def degradation_rate(self) -> float | None:
+        return self.primary.degradation_rate if self.primary else None
+
+    @property
+    def count(self) -> int:
+        return sum(trend.count for trend in self.kinds.values())
+
+    def by_kind(self) -> dict[str, dict[str, Any]]:
+        return {
+            kind: {
+                "score": trend.score,
+                "degradation_rate": trend.degradation_rate,
+                "tests": trend.count,
+            }
+            for kind, trend in self.kinds.items()
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "folded": sorted(self.folded),
+            "summaries": [list(summary) for summary in self.summaries],
+            "kinds": {kind: trend.as_dict() for kind, trend in self.kinds.items()},
+        }
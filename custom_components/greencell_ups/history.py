@@ -0,0 +1,132 @@
+"""Incrementally synced cache of the UPS self-test history."""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from .measurements import Measurement
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def test_revision(test: dict[str, Any]) -> Any:
+    """Return what identifies one version of a test record.
+
+    Firmware that exposes the CouchDB-style ``_rev`` gets it; otherwise the end
+    date, which only changes once, when the test completes.
+    """
+    return test.get("_rev") or test.get("date_end")
+
+
+def test_completed(test: dict[str, Any]) -> bool:
+    return bool(test.get("date_end"))
+
+
+class CachedTest:
+    """A test record and its measurements as stored in the cache."""
+
+    __slots__ = ("test", "revision", "measurements")
+
+    def __init__(self, test: dict[str, Any], revision: Any, measurements: list[Measurement]) -> None:
+        self.test = test
+        self.revision = revision
+        self.measurements = measurements
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "test": self.test,
+            "revision": self.revision,
+            # Plain lists keep the stored JSON compact
+            "measurements": [list(measurement) for measurement in self.measurements],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> CachedTest:
+        return cls(
+            data["test"],
+            data.get("revision"),
+            [Measurement(*row) for row in data.get("measurements", ())],
+        )
+
+
+class TestHistory:
+    """Test records and measurements keyed by test id.
+
+    Completed tests never change, so once cached at their revision they are
+    not downloaded again. Running tests (``date_end == 0``) are fetched on
+    every sync and kept in memory only.
+    """
+
+    __test__ = False  # not a pytest test class
+
+    def __init__(self, data: dict[str, Any] | None = None) -> None:
+        self.completed: dict[str, CachedTest] = {
+            test_id: CachedTest.from_dict(entry)
+            for test_id, entry in ((data or {}).get("tests") or {}).items()
+        }
+        self.running: dict[str, CachedTest] = {}
+        self.downloads = 0
+        self.dirty = False
+
+    def get(self, test_id: str) -> CachedTest | None:
+        return self.running.get(test_id) or self.completed.get(test_id)
+
+    def tests(self) -> list[CachedTest]:
+        """All known tests, newest first."""
+        return sorted(
+            [*self.completed.values(), *self.running.values()],
+            key=lambda entry: entry.test.get("date_start") or 0,
+            reverse=True,
+        )
+
+    def needs_download(self, test: dict[str, Any]) -> bool:
+        if not test_completed(test):
+            return True
+        cached = self.completed.get(test.get("id"))
+        return cached is None or cached.revision != test_revision(test)
+
+    async def async_sync(self, api) -> list[str]:
+        """Bring the cache up to date; return ids of newly completed tests.
+
+        ``dirty`` is set whenever the persisted part of the cache changed.
+        """
+        tests = await api.fetch_statistics_tests()
+        reported: set[str] = set()
+        newly_completed: list[str] = []
+        running: dict[str, CachedTest] = {}
+        for test in tests or ():
+            test_id = test.get("id")
+            if not test_id:
+                continue
+            reported.add(test_id)
+            if not self.needs_download(test):
+                continue
+            measurements = [m async for m in api.iter_test_measurements(test_id)]
+            self.downloads += 1
+            entry = CachedTest(test, test_revision(test), measurements)
+            if test_completed(test):
+                if test_id not in self.completed:
+                    newly_completed.append(test_id)
+                self.completed[test_id] = entry
+                self.dirty = True
+            else:
+                running[test_id] = entry
+        self.running = running
+
+        # The device keeps a bounded history; follow it so the store stays bounded
+        # too. An empty listing is more likely a glitch than a wiped history.
+        dropped = [test_id for test_id in self.completed if test_id not in reported] if reported else []
+        for test_id in dropped:
+            del self.completed[test_id]
+            self.dirty = True
+        _LOGGER.debug(
+            "Test history: %d new completed, %d dropped, %d running, %d cached",
+            len(newly_completed),
+            len(dropped),
+            len(running),
+            len(self.completed),
+        )
+        return newly_completed
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"tests": {test_id: entry.as_dict() for test_id, entry in self.completed.items()}}
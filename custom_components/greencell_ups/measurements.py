@@ -0,0 +1,90 @@
+"""Streaming decode of the UPS test-measurement history."""
+from __future__ import annotations
+
+import codecs
+import json
+from typing import Any, NamedTuple
+
+# A single measurement record is a few hundred bytes; anything far larger that
+# still does not decode means the stream is not what we expect.
+MAX_PENDING_ELEMENT = 64 * 1024  # characters
+
+_WHITESPACE = " \t\n\r"
+
+
+class Measurement(NamedTuple):
+    """One sample of a test run, without the storage bookkeeping fields."""
+
+    timestamp: int
+    load: float | None
+    battery_voltage: float | None
+    battery_level: float | None
+    utility_fail: bool
+
+    @classmethod
+    def from_record(cls, record: dict[str, Any]) -> Measurement:
+        return cls(
+            record.get("timestamp"),
+            record.get("load"),
+            record.get("battery_voltage"),
+            record.get("battery_level"),
+            bool(record.get("utility_fail")),
+        )
+
+
+class JsonArrayParser:
+    """Split a JSON array into its elements as the bytes arrive.
+
+    Only the unparsed tail of the body is buffered, so memory stays bounded by
+    the size of one element however long the array is. Elements must be
+    self-delimiting (objects, arrays, strings): a bare number split across two
+    chunks would be cut short.
+    """
+
+    def __init__(self) -> None:
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._started = False
+        self._done = False
+        self.count = 0
+
+    def feed(self, chunk: bytes) -> list[Any]:
+        """Consume a chunk and return the elements it completed."""
+        buffer = self._buffer + self._text.decode(chunk)
+        elements: list[Any] = []
+        pos = 0
+        end = len(buffer)
+        while pos < end:
+            char = buffer[pos]
+            if char in _WHITESPACE or (char == "," and self._started and not self._done):
+                pos += 1
+                continue
+            if self._done:
+                raise ValueError(f"Unexpected data after JSON array: {char!r}")
+            if not self._started:
+                if char != "[":
+                    raise ValueError(f"Expected a JSON array, got {char!r}")
+                self._started = True
+                pos += 1
+                continue
+            if char == "]":
+                self._done = True
+                pos += 1
+                continue
+            try:
+                element, pos = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Element is incomplete; wait for more bytes
+                break
+            elements.append(element)
+        self._buffer = buffer[pos:]
+        if len(self._buffer) > MAX_PENDING_ELEMENT:
+            raise ValueError("JSON array element exceeds the streaming limit")
+        self.count += len(elements)
+        return elements
+
+    def close(self) -> None:
+        """Verify the array was complete once the body has ended."""
+        if not self._done or self._buffer.strip():
+            raise ValueError("JSON array ended prematurely")
@@ -0,0 +1,177 @@
+"""Per-endpoint request measurements for the Greencell API client."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import deque
+from urllib.parse import urlsplit
+
+# Timeouts derived from observed latency: p99 x factor, clamped to the bounds.
+# Until enough samples exist the per-endpoint default (or DEFAULT_TIMEOUT) is used.
+DEFAULT_TIMEOUT = 5.0  # seconds
+DEFAULT_TIMEOUTS = {
+    "/api/statistics/tests/{id}/measurements": 30.0,
+    "/api/statistics/events": 15.0,
+}
+MIN_TIMEOUT = 1.0  # seconds
+MAX_TIMEOUT = 120.0  # seconds
+TIMEOUT_FACTOR = 3.0
+MIN_LATENCY_SAMPLES = 10
+LATENCY_WINDOW = 100
+
+# Upper bounds (seconds) of the latency histogram buckets; one overflow bucket follows
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def endpoint_template(path: str) -> str:
+    """Collapse a request path into its endpoint, e.g. ids become ``{id}``."""
+    segments = urlsplit(path).path.split("/")
+    return "/".join(
+        "{id}" if len(segment) >= 8 and any(ch.isdigit() for ch in segment) else segment
+        for segment in segments
+    )
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(int(round(q * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+class LatencyTracker:
+    """Keep a rolling latency window per endpoint and derive timeouts from it.
+
+    Timeouts are counted on their own rather than fed into the window: a miss
+    recorded at the timeout value would push p99 up and with it the next
+    timeout, escalating a briefly unreachable UPS straight to ``MAX_TIMEOUT``.
+    """
+
+    def __init__(self, overrides: dict[str, float] | None = None) -> None:
+        self.overrides = {key: value for key, value in (overrides or {}).items() if value}
+        self._samples: dict[str, deque[float]] = {}
+        self.timeouts: dict[str, int] = {}
+
+    @property
+    def endpoints(self) -> list[str]:
+        return list(dict.fromkeys([*self._samples, *self.timeouts]))
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        samples = self._samples.get(endpoint)
+        if samples is None:
+            samples = self._samples[endpoint] = deque(maxlen=LATENCY_WINDOW)
+        samples.append(seconds)
+
+    def record_timeout(self, endpoint: str) -> None:
+        self.timeouts[endpoint] = self.timeouts.get(endpoint, 0) + 1
+
+    def percentile(self, endpoint: str, q: float) -> float | None:
+        samples = self._samples.get(endpoint)
+        if not samples:
+            return None
+        return _percentile(list(samples), q)
+
+    def timeout_for(self, endpoint: str) -> float:
+        override = self.overrides.get(endpoint)
+        if override:
+            return override
+        samples = self._samples.get(endpoint)
+        if samples is None or len(samples) < MIN_LATENCY_SAMPLES:
+            return DEFAULT_TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT)
+        p99 = _percentile(list(samples), 0.99)
+        return min(max(p99 * TIMEOUT_FACTOR, MIN_TIMEOUT), MAX_TIMEOUT)
+
+
+class EndpointStats:
+    """Counters for one endpoint: requests, errors, latency, payload size, decode time."""
+
+    __slots__ = (
+        "requests",
+        "errors",
+        "latency_buckets",
+        "latency_total",
+        "response_bytes",
+        "last_response_bytes",
+        "decode_time",
+        "last_decode_time",
+    )
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors: dict[str, int] = {}
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_total = 0.0
+        self.response_bytes = 0
+        self.last_response_bytes: int | None = None
+        self.decode_time = 0.0
+        self.last_decode_time: float | None = None
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.errors.values())
+
+    @property
+    def completed(self) -> int:
+        return sum(self.latency_buckets)
+
+    @property
+    def mean_latency(self) -> float | None:
+        completed = self.completed
+        return self.latency_total / completed if completed else None
+
+    def record_latency(self, seconds: float) -> None:
+        self.latency_buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.latency_total += seconds
+
+    def record_response(self, size: int | None, decode_seconds: float | None) -> None:
+        if size is not None:
+            self.response_bytes += size
+            self.last_response_bytes = size
+        if decode_seconds is not None:
+            self.decode_time += decode_seconds
+            self.last_decode_time = decode_seconds
+
+    def record_error(self, err: BaseException) -> None:
+        name = type(err).__name__
+        self.errors[name] = self.errors.get(name, 0) + 1
+
+    def as_dict(self) -> dict:
+        labels = [f"<={bound:g}s" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]:g}s"]
+        return {
+            "requests": self.requests,
+            "errors": dict(self.errors),
+            "latency_histogram": dict(zip(labels, self.latency_buckets)),
+            "mean_latency": self.mean_latency,
+            "response_bytes": self.response_bytes,
+            "last_response_bytes": self.last_response_bytes,
+            "decode_time": self.decode_time,
+            "last_decode_time": self.last_decode_time,
+        }
+
+
+class RequestMetrics:
+    """Per-endpoint stats plus connection-level timings fed by aiohttp trace hooks."""
+
+    def __init__(self) -> None:
+        self.endpoints: dict[str, EndpointStats] = {}
+        self.dns_lookups = 0
+        self.dns_cache_hits = 0
+        self.dns_time = 0.0
+
+    def endpoint(self, endpoint: str) -> EndpointStats:
+        stats = self.endpoints.get(endpoint)
+        if stats is None:
+            stats = self.endpoints[endpoint] = EndpointStats()
+        return stats
+
+    def record_dns(self, seconds: float) -> None:
+        self.dns_lookups += 1
+        self.dns_time += seconds
+
+    def as_dict(self) -> dict:
+        return {
+            "dns": {
+                "lookups": self.dns_lookups,
+                "cache_hits": self.dns_cache_hits,
+                "time": self.dns_time,
+            },
+            "endpoints": {name: stats.as_dict() for name, stats in self.endpoints.items()},
+        }
@@ -0,0 +1,105 @@
+"""High-resolution capture of mains outages."""
+from __future__ import annotations
+
+import math
+from typing import Any, NamedTuple
+
+from .samples import RingBuffer
+from .status import UpsStatus
+
+OUTAGE_COLUMNS = {
+    "time": "d",  # epoch seconds
+    "load": "f",  # percent
+    "battery_voltage": "f",
+    "battery_level": "f",
+    "output_voltage": "f",
+}
+
+
+class OutageRecord(NamedTuple):
+    started_at: float  # epoch seconds
+    ended_at: float
+    duration: float  # seconds
+    samples: int
+    min_battery_voltage: float | None
+    min_battery_level: float | None
+    energy_wh: float | None  # None without the rated power of the UPS
+
+    def as_dict(self) -> dict[str, Any]:
+        return self._asdict()
+
+
+class OutageRecorder:
+    """Record samples while ``utilityFail`` is set and summarize the outage.
+
+    Only the last ``capacity`` samples are kept for inspection; minimums and
+    the energy integral are accumulated as samples arrive, so the summary
+    covers the whole outage whatever its length.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.buffer = RingBuffer(capacity, OUTAGE_COLUMNS)
+        self.active = False
+        self.samples = 0
+        self._started_at = 0.0
+        self._last: tuple[float, float] | None = None  # time, load
+        self._min_voltage = math.inf
+        self._min_level = math.inf
+        self._load_seconds = 0.0  # integral of load percent over time
+
+    def update(self, status: UpsStatus, now: float, rated_power: float | None = None) -> OutageRecord | None:
+        """Fold in one status sample; return the record when an outage ended."""
+        if status.utility_fail:
+            if not self.active:
+                self._start(now)
+            self._record(status, now)
+            return None
+        if self.active:
+            return self._finish(now, rated_power)
+        return None
+
+    def _start(self, now: float) -> None:
+        self.active = True
+        self.samples = 0
+        self.buffer.clear()
+        self._started_at = now
+        self._last = None
+        self._min_voltage = math.inf
+        self._min_level = math.inf
+        self._load_seconds = 0.0
+
+    def _record(self, status: UpsStatus, now: float) -> None:
+        load = status.load
+        self.buffer.append(
+            time=now,
+            load=load,
+            battery_voltage=status.battery_voltage,
+            battery_level=status.battery_level,
+            output_voltage=status.output_voltage,
+        )
+        self.samples += 1
+        if status.battery_voltage is not None:
+            self._min_voltage = min(self._min_voltage, status.battery_voltage)
+        if status.battery_level is not None:
+            self._min_level = min(self._min_level, status.battery_level)
+        if load is not None:
+            if self._last is not None:
+                # Trapezoid between consecutive samples
+                last_time, last_load = self._last
+                self._load_seconds += (now - last_time) * (load + last_load) / 2
+            self._last = (now, load)
+
+    def _finish(self, now: float, rated_power: float | None) -> OutageRecord:
+        self.active = False
+        energy = None
+        if rated_power:
+            energy = round(self._load_seconds / 100.0 * rated_power / 3600.0, 3)
+        return OutageRecord(
+            started_at=self._started_at,
+            ended_at=now,
+            duration=now - self._started_at,
+            samples=self.samples,
+            min_battery_voltage=self._min_voltage if self._min_voltage != math.inf else None,
+            min_battery_level=self._min_level if self._min_level != math.inf else None,
+            energy_wh=energy,
+        )
@@ -0,0 +1,342 @@
+"""Poll scheduling helpers for the Greencell coordinator."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Mapping, NamedTuple
+
+from .api import GreencellApiError
+
+_LOGGER = logging.getLogger(__name__)
+
+# Status flags that warrant second-level resolution while they are set
+ALERT_KEYS = ("utilityFail", "batteryLow", "testInProgress")
+
+# Command action -> (status key, expected value once the UPS executed it).
+# None means the value flips relative to the state before the command.
+COMMAND_EXPECTATIONS: dict[str, tuple[str, bool | None]] = {
+    "beeperToggleOrder": ("beeperOn", None),
+    "shutdownOrder": ("shutdownActive", True),
+    "wakeUpOrder": ("shutdownActive", False),
+    "shortTestOrder": ("testInProgress", True),
+    "longTestOrder": ("testInProgress", True),
+    "cancelTestOrder": ("testInProgress", False),
+}
+CONFIRM_INITIAL_DELAY = 0.25  # seconds
+CONFIRM_MAX_DELAY = 2.0  # seconds
+CONFIRM_TIMEOUT = 15.0  # seconds
+
+# Fractional part of the golden ratio: slot offsets i * PHI (mod 1) stay evenly
+# spread over the interval no matter how many entries end up registered.
+PHI = 0.6180339887498949
+
+
+class AdaptivePollPolicy:
+    """Pick the next poll interval from the latest UPS status.
+
+    The interval drops to ``floor`` while an alert flag is set or the load
+    jumps between polls. Once the UPS has been calm for ``stable_polls``
+    consecutive polls, the interval grows by ``backoff`` up to ``ceiling``.
+    """
+
+    def __init__(
+        self,
+        base: float,
+        floor: float,
+        ceiling: float,
+        load_step: float = 5.0,
+        stable_polls: int = 5,
+        backoff: float = 1.5,
+    ) -> None:
+        self.floor = min(floor, base)
+        self.ceiling = max(ceiling, base)
+        self.load_step = load_step
+        self.stable_polls = stable_polls
+        self.backoff = backoff
+        self.interval = float(base)
+        self._calm_polls = 0
+        self._last_load: float | None = None
+
+    def _load_jumped(self, load: Any) -> bool:
+        if not isinstance(load, (int, float)) or isinstance(load, bool):
+            return False
+        previous, self._last_load = self._last_load, float(load)
+        return previous is not None and abs(load - previous) >= self.load_step
+
+    def update(self, data: Mapping[str, Any] | None) -> float:
+        """Feed the latest status and return the interval until the next poll."""
+        data = data or {}
+        load_jumped = self._load_jumped(data.get("load"))
+        if load_jumped or any(data.get(key) for key in ALERT_KEYS):
+            self._calm_polls = 0
+            self.interval = self.floor
+            return self.interval
+
+        self._calm_polls += 1
+        if self._calm_polls >= self.stable_polls:
+            self._calm_polls = 0
+            self.interval = min(self.interval * self.backoff, self.ceiling)
+        return self.interval
+
+
+class _ScheduledPoll:
+    __slots__ = ("key", "slot", "interval", "refresh", "due", "handle", "task", "lag")
+
+    def __init__(
+        self,
+        key: str,
+        slot: int,
+        interval: Callable[[], float],
+        refresh: Callable[[], Awaitable[Any]],
+    ) -> None:
+        self.key = key
+        self.slot = slot
+        self.interval = interval
+        self.refresh = refresh
+        self.due = 0.0
+        self.handle: asyncio.TimerHandle | None = None
+        self.task: asyncio.Task | None = None
+        self.lag: float | None = None
+
+
+class FleetPollScheduler:
+    """Drive the polls of all config entries from one place.
+
+    Each entry gets a phase offset inside its interval (plus jitter) so entries
+    started together do not poll in step, and at most ``max_concurrent`` polls
+    run at once. ``lag`` reports how late the last poll of an entry started
+    compared to its planned time.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        max_concurrent: int,
+        jitter: float,
+    ) -> None:
+        self._loop = loop
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._jitter = jitter
+        self._entries: dict[str, _ScheduledPoll] = {}
+
+    def register(
+        self,
+        key: str,
+        interval: Callable[[], float],
+        refresh: Callable[[], Awaitable[Any]],
+    ) -> None:
+        """Start polling ``key`` every ``interval()`` seconds by awaiting ``refresh``."""
+        self.unregister(key)
+        used = {entry.slot for entry in self._entries.values()}
+        slot = next(i for i in range(len(used) + 1) if i not in used)
+        entry = _ScheduledPoll(key, slot, interval, refresh)
+        self._entries[key] = entry
+        period = interval()
+        offset = (slot * PHI) % 1.0 * period
+        self._schedule(entry, self._loop.time() + offset + self._jitter_for(period))
+
+    def unregister(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        if entry.handle is not None:
+            entry.handle.cancel()
+        if entry.task is not None and not entry.task.done():
+            entry.task.cancel()
+
+    def lag(self, key: str) -> float | None:
+        entry = self._entries.get(key)
+        return entry.lag if entry else None
+
+    def _jitter_for(self, period: float) -> float:
+        return random.uniform(0, self._jitter * period)
+
+    def _schedule(self, entry: _ScheduledPoll, due: float) -> None:
+        entry.due = due
+        entry.handle = self._loop.call_at(due, self._start, entry)
+
+    def _start(self, entry: _ScheduledPoll) -> None:
+        entry.handle = None
+        entry.task = self._loop.create_task(self._run(entry))
+
+    async def _run(self, entry: _ScheduledPoll) -> None:
+        try:
+            async with self._semaphore:
+                entry.lag = max(self._loop.time() - entry.due, 0.0)
+                await entry.refresh()
+        except asyncio.CancelledError:
+            raise
+        except Exception:  # noqa: BLE001 - keep the schedule alive
+            _LOGGER.exception("Scheduled poll for %s failed", entry.key)
+        if self._entries.get(entry.key) is not entry:
+            return
+        period = entry.interval()
+        due = entry.due + period
+        now = self._loop.time()
+        if due < now:
+            # Overran the slot; keep the phase but skip the missed ticks
+            due += ((now - due) // period + 1) * period
+        self._schedule(entry, due)
+
+
+class RequestCoalescer:
+    """Funnel every call of one request through a single in-flight task.
+
+    ``fetch`` joins the call in flight. ``fetch(fresh=True)`` is for callers that
+    changed device state and need a response produced afterwards: it waits for
+    the current call and joins the one queued behind it.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        request: Callable[[], Awaitable[Any]],
+    ) -> None:
+        self._loop = loop
+        self._request = request
+        self._current: asyncio.Task | None = None
+        self._queued: asyncio.Task | None = None
+        self.calls = 0
+        self.joined = 0
+
+    async def fetch(self, fresh: bool = False) -> Any:
+        if self._current is None and self._queued is not None:
+            # The queued call is about to start; it is fresh for everyone
+            self.joined += 1
+            return await asyncio.shield(self._queued)
+        if self._current is None:
+            self._current = self._loop.create_task(self._run())
+            return await asyncio.shield(self._current)
+        self.joined += 1
+        if not fresh:
+            return await asyncio.shield(self._current)
+        if self._queued is None:
+            self._queued = self._loop.create_task(self._run_after(self._current))
+        return await asyncio.shield(self._queued)
+
+    async def _run(self) -> Any:
+        self.calls += 1
+        try:
+            return await self._request()
+        finally:
+            if self._current is asyncio.current_task():
+                self._current = None
+
+    async def _run_after(self, previous: asyncio.Task) -> Any:
+        try:
+            await asyncio.shield(previous)
+        except Exception:  # noqa: BLE001 - the queued call runs regardless
+            pass
+        self._current, self._queued = self._queued, None
+        return await self._run()
+
+
+class CommandResult(NamedTuple):
+    action: str
+    confirmed: bool
+    elapsed: float
+    polls: int
+
+
+class _PendingCommand:
+    __slots__ = ("action", "key", "expected", "started", "polls", "future")
+
+    def __init__(self, action, key, expected, started, future) -> None:
+        self.action = action
+        self.key = key
+        self.expected = expected
+        self.started = started
+        self.polls = 0
+        self.future = future
+
+
+class CommandTracker:
+    """Confirm commands with one shared polling loop per UPS.
+
+    Every pending command is checked against the same status polls, which
+    back off exponentially. A command issued while the loop waits restarts
+    the backoff, so a burst of commands is debounced into one poll
+    ``CONFIRM_INITIAL_DELAY`` after the last of them.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        fetch: Callable[[], Awaitable[Mapping[str, Any] | None]],
+        timeout: float | None = None,
+    ) -> None:
+        self._loop = loop
+        self._fetch = fetch
+        self._timeout = timeout
+        self._pending: list[_PendingCommand] = []
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.polls = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def wait(self, action: str, before: Mapping[str, Any] | None) -> CommandResult:
+        """Return once the status shows ``action`` took effect or its deadline passed."""
+        key, expected = COMMAND_EXPECTATIONS[action]
+        if expected is None and before is not None and before.get(key) is not None:
+            expected = not before.get(key)
+        command = _PendingCommand(
+            action, key, expected, time.monotonic(), self._loop.create_future()
+        )
+        self._pending.append(command)
+        if self._task is None or self._task.done():
+            self._task = self._loop.create_task(self._run())
+        else:
+            self._wake.set()
+        return await asyncio.shield(command.future)
+
+    def close(self) -> None:
+        """Stop polling and cancel every pending confirmation."""
+        if self._task is not None:
+            self._task.cancel()
+        pending, self._pending = self._pending, []
+        for command in pending:
+            command.future.cancel()
+
+    async def _run(self) -> None:
+        timeout = self._timeout if self._timeout is not None else CONFIRM_TIMEOUT
+        delay = CONFIRM_INITIAL_DELAY
+        while self._pending:
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            else:
+                # A new command arrived: restart the backoff from the top
+                delay = CONFIRM_INITIAL_DELAY
+                continue
+            self.polls += 1
+            try:
+                status = await self._fetch()
+            except GreencellApiError as err:
+                _LOGGER.debug("Status poll while confirming commands failed: %s", err)
+                status = None
+            now = time.monotonic()
+            delay = min(delay * 2, CONFIRM_MAX_DELAY)
+            for command in list(self._pending):
+                command.polls += 1
+                elapsed = now - command.started
+                if status is not None and (
+                    command.expected is None
+                    or bool(status.get(command.key)) == command.expected
+                ):
+                    confirmed = True
+                elif elapsed + delay > timeout:
+                    confirmed = False
+                else:
+                    continue
+                self._pending.remove(command)
+                if not command.future.done():
+                    command.future.set_result(
+                        CommandResult(command.action, confirmed, elapsed, command.polls)
+                    )
@@ -0,0 +1,141 @@
+"""Per-host request queue: the UPS web server copes badly with concurrency."""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+from functools import partial
+from typing import Any, Awaitable, Callable, Hashable
+
+PRIORITY_COMMAND = 0
+PRIORITY_POLL = 1
+PRIORITY_BACKGROUND = 2
+
+
+class _QueuedRequest:
+    __slots__ = ("priority", "seq", "key", "factory", "future")
+
+    def __init__(self, priority, seq, key, factory, future) -> None:
+        self.priority = priority
+        self.seq = seq
+        self.key = key
+        self.factory = factory
+        self.future = future
+
+    def __lt__(self, other: _QueuedRequest) -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class RequestQueue:
+    """Run at most ``limit`` polls and commands at once, highest priority first.
+
+    Commands jump ahead of everything queued and additionally get one reserved
+    slot, so a shutdown never waits behind another request. Background
+    requests run one at a time in a lane of their own, so a statistics
+    download never holds a poll slot; they only start once no poll or command
+    is waiting. At most ``max_in_flight`` requests reach the device. A queued
+    non-command request is dropped in favour of joining an identical one (same
+    ``key``) that is already waiting, so stale duplicate polls never reach the
+    device.
+    """
+
+    def __init__(self, limit: int = 1) -> None:
+        self.limit = max(int(limit), 1)
+        self._heap: list[_QueuedRequest] = []
+        self._queued_by_key: dict[Hashable, _QueuedRequest] = {}
+        self._seq = itertools.count()
+        self._active = 0
+        self._active_commands = 0
+        self._active_background = 0
+        self._tasks: set[asyncio.Task] = set()
+        self.dropped = 0
+
+    @property
+    def max_in_flight(self) -> int:
+        """Upper bound of concurrent requests: the limit, a command and a background slot."""
+        return self.limit + 2
+
+    @property
+    def pending(self) -> int:
+        return len(self._heap)
+
+    async def run(
+        self,
+        priority: int,
+        factory: Callable[[], Awaitable[Any]],
+        key: Hashable | None = None,
+    ) -> Any:
+        """Queue ``factory()`` and return its result once it ran."""
+        if key is not None and priority != PRIORITY_COMMAND:
+            queued = self._queued_by_key.get(key)
+            if queued is not None:
+                self.dropped += 1
+                if priority < queued.priority:
+                    # Promote the shared request to the more urgent priority
+                    queued.priority = priority
+                    heapq.heapify(self._heap)
+                return await asyncio.shield(queued.future)
+        request = _QueuedRequest(
+            priority,
+            next(self._seq),
+            key if priority != PRIORITY_COMMAND else None,
+            factory,
+            asyncio.get_running_loop().create_future(),
+        )
+        heapq.heappush(self._heap, request)
+        if request.key is not None:
+            self._queued_by_key[request.key] = request
+        self._pump()
+        return await asyncio.shield(request.future)
+
+    def close(self) -> None:
+        """Cancel queued and running requests, e.g. when the client shuts down."""
+        queued, self._heap = self._heap, []
+        self._queued_by_key.clear()
+        for request in queued:
+            request.future.cancel()
+        for task in list(self._tasks):
+            task.cancel()
+
+    def _has_capacity(self, request: _QueuedRequest) -> bool:
+        if request.priority == PRIORITY_BACKGROUND:
+            return self._active_background == 0
+        if self._active - self._active_background < self.limit:
+            return True
+        return request.priority == PRIORITY_COMMAND and self._active_commands == 0
+
+    def _pump(self) -> None:
+        while self._heap and self._has_capacity(self._heap[0]):
+            request = heapq.heappop(self._heap)
+            if request.key is not None:
+                self._queued_by_key.pop(request.key, None)
+            self._active += 1
+            if request.priority == PRIORITY_COMMAND:
+                self._active_commands += 1
+            elif request.priority == PRIORITY_BACKGROUND:
+                self._active_background += 1
+            task = asyncio.ensure_future(self._execute(request))
+            self._tasks.add(task)
+            task.add_done_callback(partial(self._finished, request))
+
+    async def _execute(self, request: _QueuedRequest) -> None:
+        try:
+            result = await request.factory()
+        except Exception as err:  # noqa: BLE001 - handed to the waiters
+            if not request.future.done():
+                request.future.set_exception(err)
+        else:
+            if not request.future.done():
+                request.future.set_result(result)
+
+    def _finished(self, request: _QueuedRequest, task: asyncio.Task) -> None:
+        # Runs even for a task cancelled before it started, unlike a finally
+        self._tasks.discard(task)
+        if task.cancelled():
+            request.future.cancel()
+        self._active -= 1
+        if request.priority == PRIORITY_COMMAND:
+            self._active_commands -= 1
+        elif request.priority == PRIORITY_BACKGROUND:
+            self._active_background -= 1
+        self._pump()
@@ -0,0 +1,97 @@
+"""Online estimate of the runtime left on battery."""
+from __future__ import annotations
+
+from typing import Iterable
+
+from .measurements import Measurement
+from .status import UpsStatus
+
+# Weight of the newest sample in the smoothed load
+LOAD_SMOOTHING = 0.2
+# Weight of a newly observed discharge rate against what was learned before
+RATE_SMOOTHING = 0.5
+# Loads below this (percent) are treated as this, so idle never means "forever"
+MIN_LOAD = 1.0
+
+
+def discharge_rate(
+    elapsed: float, level_drop: float, mean_load: float
+) -> float | None:
+    """Battery percent per second per percent of load, or None if unmeasurable."""
+    if elapsed <= 0 or level_drop <= 0 or mean_load <= 0:
+        return None
+    return level_drop / elapsed / mean_load
+
+
+class RuntimeEstimator:
+    """Runtime left = battery level / (discharge rate per load x smoothed load).
+
+    The discharge rate is learned from level drops seen while ``utilityFail``
+    is set and from past long tests; every status sample costs O(1).
+    """
+
+    __slots__ = ("load", "rate", "observations", "remaining", "_segment")
+
+    def __init__(self) -> None:
+        self.load: float | None = None
+        self.rate: float | None = None
+        self.observations = 0
+        self.remaining: float | None = None  # seconds
+        # Current on-battery stretch: start time, start level, load sum, samples
+        self._segment: list[float] | None = None
+
+    def learn(self, rate: float | None) -> None:
+        if rate is None:
+            return
+        self.rate = rate if self.rate is None else RATE_SMOOTHING * rate + (1 - RATE_SMOOTHING) * self.rate
+        self.observations += 1
+
+    def learn_from_test(self, measurements: Iterable[Measurement]) -> float | None:
+        """Learn the discharge rate of a completed long test."""
+        first = last = None
+        load_sum = 0.0
+        samples = 0
+        for measurement in measurements:
+            if measurement.battery_level is None:
+                continue
+            first = first or measurement
+            last = measurement
+            load_sum += measurement.load or 0.0
+            samples += 1
+        if not samples:
+            return None
+        rate = discharge_rate(
+            (last.timestamp - first.timestamp) / 1000.0,
+            first.battery_level - last.battery_level,
+            load_sum / samples,
+        )
+        self.learn(rate)
+        return rate
+
+    def update(self, status: UpsStatus, now: float) -> float | None:
+        """Fold in one status sample and return the remaining runtime in seconds."""
+        if status.load is not None:
+            self.load = (
+                status.load
+                if self.load is None
+                else LOAD_SMOOTHING * status.load + (1 - LOAD_SMOOTHING) * self.load
+            )
+        level = status.battery_level
+        if status.utility_fail and level is not None:
+            segment = self._segment
+            if segment is None:
+                self._segment = [now, level, status.load or 0.0, 1]
+            else:
+                segment[2] += status.load or 0.0
+                segment[3] += 1
+                if level < segment[1]:
+                    self.learn(discharge_rate(now - segment[0], segment[1] - level, segment[2] / segment[3]))
+                    self._segment = [now, level, status.load or 0.0, 1]
+        else:
+            self._segment = None
+
+        if self.rate is None or self.load is None or level is None:
+            self.remaining = None
+        else:
+            self.remaining = level / (self.rate * max(self.load, MIN_LOAD))
+        return self.remaining
@@ -0,0 +1,177 @@
+"""Fixed-size, array-backed sample storage."""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from operator import mul
+from typing import Any, Callable, Iterator, Mapping, NamedTuple
+
+
+class RingBuffer:
+    """Keep the last ``capacity`` rows in typed ``array`` columns.
+
+    Storage is allocated once; appending overwrites the oldest row in O(1), so
+    memory does not grow however long recording runs. Missing values are
+    stored as NaN in float columns.
+    """
+
+    __slots__ = ("capacity", "_columns", "_next", "_size")
+
+    def __init__(self, capacity: int, columns: Mapping[str, str]) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._columns = {
+            name: array(typecode, [0]) * capacity for name, typecode in columns.items()
+        }
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        return tuple(self._columns)
+
+    def append(self, **values: float) -> None:
+        self._write(self._next, values)
+        self._next = (self._next + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def replace_last(self, **values: float) -> None:
+        """Overwrite the newest row in place."""
+        if not self._size:
+            raise IndexError("replace_last on an empty buffer")
+        self._write((self._next - 1) % self.capacity, values)
+
+    def _write(self, index: int, values: Mapping[str, float]) -> None:
+        for name, column in self._columns.items():
+            value = values.get(name)
+            column[index] = value if value is not None else (float("nan") if column.typecode in "fd" else 0)
+
+    def clear(self) -> None:
+        self._next = 0
+        self._size = 0
+
+    def column(self, name: str) -> array:
+        """Return a column's values, oldest first, as a new array."""
+        column = self._columns[name]
+        if self._size < self.capacity:
+            return column[: self._size]
+        return column[self._next :] + column[: self._next]
+
+    def rows(self) -> Iterator[dict[str, float]]:
+        """Yield each row as a dict, oldest first."""
+        columns = {name: self.column(name) for name in self._columns}
+        for index in range(self._size):
+            yield {name: values[index] for name, values in columns.items()}
+
+
+class WindowStats(NamedTuple):
+    count: int
+    minimum: float | None
+    maximum: float | None
+    mean: float | None
+    rate: float | None  # least-squares slope, units per minute
+    span: float  # seconds between the oldest and newest sample in the window
+
+
+_EMPTY_WINDOW = WindowStats(0, None, None, None, None, 0.0)
+_BUCKET_COLUMNS = {"time": "d", "value": "d", "minimum": "d", "maximum": "d", "count": "l"}
+
+
+class SampleHistory:
+    """Rolling history of numeric status values, downsampled into time buckets.
+
+    Samples less than ``resolution`` seconds after the start of the newest
+    bucket are folded into it (mean, min, max, count), so ``capacity`` buckets
+    always cover ``capacity * resolution`` seconds however fast the UPS is
+    polled. Each key has its own ring buffer so missing values cost nothing.
+    Appends are O(1). Aggregates run the C-level builtins (``min``, ``max``,
+    ``sum``) over array slices rather than Python loops.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        accessors: Mapping[str, Callable[[Any], Any]],
+        resolution: float = 0.0,
+    ) -> None:
+        self.resolution = resolution
+        self._accessors = dict(accessors)
+        self._buffers = {key: RingBuffer(capacity, _BUCKET_COLUMNS) for key in accessors}
+        # Running aggregates of each key's newest bucket: start, sum, count, min, max
+        self._open: dict[str, list[float]] = {}
+
+    @property
+    def keys(self) -> tuple[str, ...]:
+        return tuple(self._buffers)
+
+    def __len__(self) -> int:
+        return max((len(buffer) for buffer in self._buffers.values()), default=0)
+
+    def append(self, sample: Any, now: float) -> None:
+        for key, buffer in self._buffers.items():
+            value = self._accessors[key](sample)
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            bucket = self._open.get(key)
+            if bucket is not None and now - bucket[0] < self.resolution:
+                bucket[1] += value
+                bucket[2] += 1
+                bucket[3] = min(bucket[3], value)
+                bucket[4] = max(bucket[4], value)
+                buffer.replace_last(
+                    time=bucket[0],
+                    value=bucket[1] / bucket[2],
+                    minimum=bucket[3],
+                    maximum=bucket[4],
+                    count=bucket[2],
+                )
+            else:
+                self._open[key] = [now, value, 1, value, value]
+                buffer.append(time=now, value=value, minimum=value, maximum=value, count=1)
+
+    def _columns(self, key: str, seconds: float | None) -> dict[str, array]:
+        """Bucket columns of a key, oldest first, optionally only the last ``seconds``."""
+        buffer = self._buffers[key]
+        columns = {name: buffer.column(name) for name in buffer.columns}
+        times = columns["time"]
+        if seconds is not None and times:
+            start = bisect_left(times, times[-1] - seconds)
+            columns = {name: values[start:] for name, values in columns.items()}
+        return columns
+
+    def span(self, key: str) -> float:
+        """Seconds of history currently held for ``key``."""
+        times = self._buffers[key].column("time")
+        return times[-1] - times[0] if times else 0.0
+
+    def stats(self, key: str, seconds: float | None = None) -> WindowStats:
+        columns = self._columns(key, seconds)
+        times, values, counts = columns["time"], columns["value"], columns["count"]
+        if not times:
+            return _EMPTY_WINDOW
+        count = sum(counts)
+        mean = sum(map(mul, values, counts)) / count
+        buckets = len(times)
+        rate = None
+        if buckets >= 2 and times[-1] > times[0]:
+            # Slope on times relative to the window start keeps the sums well conditioned
+            origin = times[0]
+            offsets = array("d", (t - origin for t in times))
+            sum_t = sum(offsets)
+            denominator = buckets * sum(map(mul, offsets, offsets)) - sum_t * sum_t
+            if denominator > 0:
+                slope = (buckets * sum(map(mul, offsets, values)) - sum_t * sum(values)) / denominator
+                rate = slope * 60.0
+        return WindowStats(
+            count,
+            min(columns["minimum"]),
+            max(columns["maximum"]),
+            mean,
+            rate,
+            times[-1] - times[0],
+        )
@@ -1,18 +1,33 @@
 from __future__ import annotations
 
+import time
+from datetime import datetime, timezone
 from typing import Any, TYPE_CHECKING
 
 from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
 from homeassistant.const import CONF_HOST
-from homeassistant.helpers import device_registry as dr
+from homeassistant.core import callback
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, MANUFACTURER
+from .const import (
+    BATTERY_TREND_WINDOW,
+    CONF_HEARTBEAT_INTERVAL,
+    CONF_MIN_PUBLISH_INTERVAL,
+    CONF_SENSOR_DEADBANDS,
+    CONF_SENSOR_MIN_INTERVALS,
+    DEFAULT_HEARTBEAT_INTERVAL,
+    DEFAULT_MIN_PUBLISH_INTERVAL,
+    DOMAIN,
+    INPUT_VOLTAGE_RANGE_WINDOW,
+    LOAD_AVERAGE_WINDOW,
+)
+from .filters import SensorFilter, parse_deadband
+from .status import status_accessor
 
 if TYPE_CHECKING:
-    from .coordinator import GreencellCoordinator
+    from .coordinator import GreencellCoordinator, GreencellStatisticsCoordinator
 
 SENSORS = {
     "inputVoltage": {
@@ -20,12 +35,14 @@ SENSORS = {
         "unit": "V",
         "device_class": SensorDeviceClass.VOLTAGE,
         "icon": "mdi:transmission-tower",
+        "deadband": 1.0,
     },
     "inputVoltageFault": {
         "name": "Input Voltage Fault",
         "unit": "V",
         "device_class": SensorDeviceClass.VOLTAGE,
         "icon": "mdi:flash-alert",
+        "deadband": 1.0,
         "entity_category": EntityCategory.DIAGNOSTIC,
         "enabled_by_default": False,
     },
@@ -34,12 +51,14 @@ SENSORS = {
         "unit": "V",
         "device_class": SensorDeviceClass.VOLTAGE,
         "icon": "mdi:power-plug",
+        "deadband": 1.0,
     },
     "batteryVoltage": {
         "name": "Battery Voltage",
         "unit": "V",
         "device_class": SensorDeviceClass.VOLTAGE,
         "icon": "mdi:car-battery",
+        "deadband": 0.2,
     },
     "batteryVoltageNominal": {
         "name": "Battery Voltage Nominal",
@@ -87,6 +106,7 @@ SENSORS = {
         "unit": "Hz",
         "device_class": SensorDeviceClass.FREQUENCY,
         "icon": "mdi:sine-wave",
+        "deadband": 0.2,
     },
     "inputFrequencyNominal": {
         "name": "Input Frequency Nominal",
@@ -144,9 +164,219 @@ SENSORS = {
         "icon": "mdi:lan",
         "entity_category": EntityCategory.DIAGNOSTIC,
         "enabled_by_default": False,
+        "source": "mac_address",
+    },
+    "runtimeRemaining": {
+        "name": "Runtime Remaining",
+        "unit": "min",
+        "device_class": SensorDeviceClass.DURATION,
+        "icon": "mdi:timer-sand",
+        "source": "runtime_remaining",
+        "volatile": True,
+    },
+    # Aggregates over the coordinator's rolling sample history
+    "loadAverage": {
+        "name": "Load Average",
+        "unit": "%",
+        "icon": "mdi:chart-bell-curve",
+        "enabled_by_default": False,
+        "source": "load_average",
+        "volatile": True,
+        "history": ("load", LOAD_AVERAGE_WINDOW),
+    },
+    "batteryVoltageTrend": {
+        "name": "Battery Voltage Trend",
+        "unit": "V/min",
+        "icon": "mdi:chart-line",
+        "entity_category": EntityCategory.DIAGNOSTIC,
+        "enabled_by_default": False,
+        "source": "battery_voltage_trend",
+        "volatile": True,
+        "history": ("batteryVoltage", BATTERY_TREND_WINDOW),
+    },
+    "inputVoltageMin": {
+        "name": "Input Voltage Min (1 h)",
+        "unit": "V",
+        "device_class": SensorDeviceClass.VOLTAGE,
+        "icon": "mdi:arrow-collapse-down",
+        "entity_category": EntityCategory.DIAGNOSTIC,
+        "enabled_by_default": False,
+        "source": "input_voltage_min",
+        "volatile": True,
+        "history": ("inputVoltage", INPUT_VOLTAGE_RANGE_WINDOW),
+    },
+    "inputVoltageMax": {
+        "name": "Input Voltage Max (1 h)",
+        "unit": "V",
+        "device_class": SensorDeviceClass.VOLTAGE,
+        "icon": "mdi:arrow-collapse-up",
+        "entity_category": EntityCategory.DIAGNOSTIC,
+        "enabled_by_default": False,
+        "source": "input_voltage_max",
+        "volatile": True,
+        "history": ("inputVoltage", INPUT_VOLTAGE_RANGE_WINDOW),
+    },
+    # Read from the coordinator rather than the status payload; they stay
+    # available while the UPS is unreachable because they describe that state.
+    "circuitState": {
+        "name": "Connection Circuit",
+        "unit": None,
+        "icon": "mdi:electric-switch",
+        "entity_category": EntityCategory.DIAGNOSTIC,
+        "enabled_by_default": False,
+        "source": "circuit_state",
+        "always_available": True,
+    },
+    "circuitNextRetry": {
+        "name": "Connection Next Retry",
+        "unit": None,
+        "device_class": SensorDeviceClass.TIMESTAMP,
+        "icon": "mdi:timer-refresh-outline",
+        "entity_category": EntityCategory.DIAGNOSTIC,
+        "enabled_by_default": False,
+        "source": "circuit_next_retry",
+        "always_available": True,
+    },
+    # Client instrumentation; recomputed on every refresh
+    "statusLatency": {
+        "name": "Status Request Latency",
+        "unit": "ms",
+        "device_class": SensorDeviceClass.DURATION,
+        "icon": "mdi:timer-outline",
+        "entity_category": EntityCategory.DIAGNOSTIC,
+        "enabled_by_default": False,
+        "source": "status_latency",
+        "volatile": True,
+    },
+    "statusDecodeTime": {
+        "name": "Status Decode Time",
+        "unit": "ms",
+        "device_class": SensorDeviceClass.DURATION,
+        "icon": "mdi:code-json",
+        "entity_category": EntityCategory.DIAGNOSTIC,
+        "enabled_by_default": False,
+        "source": "status_decode_time",
+        "volatile": True,
+    },
+    "statusResponseBytes": {
+        "name": "Status Response Size",
+        "unit": "B",
+        "device_class": SensorDeviceClass.DATA_SIZE,
+        "icon": "mdi:file-outline",
+        "entity_category": EntityCategory.DIAGNOSTIC,
+        "enabled_by_default": False,
+        "source": "status_response_bytes",
+        "volatile": True,
+    },
+    "requestErrors": {
+        "name": "Request Errors",
+        "unit": None,
+        "icon": "mdi:alert-circle-outline",
+        "entity_category": EntityCategory.DIAGNOSTIC,
+        "enabled_by_default": False,
+        "source": "request_errors",
+        "volatile": True,
+        "always_available": True,
+    },
+    "loginCount": {
+        "name": "Logins",
+        "unit": None,
+        "icon": "mdi:login",
+        "entity_category": EntityCategory.DIAGNOSTIC,
+        "enabled_by_default": False,
+        "source": "login_count",
+        "volatile": True,
+    },
+}
+
+
+def _ms_timestamp(value: Any) -> datetime | None:
+    if not value:
+        return None
+    return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+
+
+def _last_test(data: dict) -> dict:
+    return data.get("last_completed_test") or {}
+
+
+# Served by the statistics coordinator, which only polls while one of these is enabled
+STATISTICS_SENSORS = {
+    "lastTest": {
+        "name": "Last Test",
+        "unit": None,
+        "device_class": SensorDeviceClass.TIMESTAMP,
+        "icon": "mdi:battery-check",
+        "entity_category": EntityCategory.DIAGNOSTIC,
+        "enabled_by_default": False,
+        "value": lambda data: _ms_timestamp(_last_test(data).get("date_end")),
+        "attributes": lambda data: data.get("last_test_analysis"),
+    },
+    "lastTestType": {
+        "name": "Last Test Type",
+        "unit": None,
+        "icon": "mdi:clipboard-check-outline",
+        "entity_category": EntityCategory.DIAGNOSTIC,
+        "enabled_by_default": False,
+        "value": lambda data: (_last_test(data).get("command") or {}).get("action"),
+    },
+    "batteryHealth": {
+        "name": "Battery Health",
+        "unit": "%",
+        "icon": "mdi:battery-heart-variant",
+        "enabled_by_default": False,
+        "value": lambda data: (
+            round(data["battery_health"], 1) if data.get("battery_health") is not None else None
+        ),
+        "attributes": lambda data: {
+            "degradation_rate": data.get("degradation_rate"),
+            "tests": data.get("health_tests"),
+            "by_kind": data.get("health_by_kind"),
+        },
+    },
+    "schedules": {
+        "name": "Schedules",
+        "unit": None,
+        "icon": "mdi:calendar-clock",
+        "entity_category": EntityCategory.DIAGNOSTIC,
+        "enabled_by_default": False,
+        "value": lambda data: len(data.get("schedules") or ()),
     },
 }
 
+
+def _build_filter(key: str, sensor_config: dict, options) -> SensorFilter | None:
+    """Build the publish filter for a sensor from its table entry and the entry options."""
+    absolute = sensor_config.get("deadband")
+    percent = sensor_config.get("deadband_pct")
+    override = options.get(CONF_SENSOR_DEADBANDS, {}).get(key)
+    if override is not None:
+        try:
+            absolute, percent = parse_deadband(override)
+        except ValueError:
+            pass
+    # A per-sensor interval (options, then table) wins; the entry-wide one only
+    # throttles sensors that have a deadband, never state-like values such as
+    # the status code
+    min_interval = options.get(CONF_SENSOR_MIN_INTERVALS, {}).get(
+        key, sensor_config.get("min_interval")
+    )
+    if min_interval is None:
+        min_interval = (
+            options.get(CONF_MIN_PUBLISH_INTERVAL, DEFAULT_MIN_PUBLISH_INTERVAL)
+            if absolute is not None or percent is not None
+            else DEFAULT_MIN_PUBLISH_INTERVAL
+        )
+    if absolute is None and percent is None and not min_interval:
+        return None
+    return SensorFilter(
+        deadband=absolute,
+        deadband_pct=percent,
+        min_interval=min_interval,
+        heartbeat=options.get(CONF_HEARTBEAT_INTERVAL, DEFAULT_HEARTBEAT_INTERVAL) or None,
+    )
+
+
 async def async_setup_entry(hass, entry, async_add_entities):
     coordinator = hass.data[DOMAIN][entry.entry_id]
     entities = [
@@ -156,17 +386,28 @@ async def async_setup_entry(hass, entry, async_add_entities):
             entry.data[CONF_HOST],
             key,
             sensor,
+            _build_filter(key, sensor, entry.options),
         )
         for key, sensor in SENSORS.items()
     ]
+    entities.extend(
+        GreencellStatisticsSensor(coordinator.statistics, entry.entry_id, key, sensor)
+        for key, sensor in STATISTICS_SENSORS.items()
+    )
     async_add_entities(entities)
 
 class GreencellSensor(CoordinatorEntity["GreencellCoordinator"], SensorEntity):
     _attr_has_entity_name = True
 
-    def __init__(self, coordinator, entry_id, host, key, sensor_config):
+    def __init__(self, coordinator, entry_id, host, key, sensor_config, publish_filter=None):
         super().__init__(coordinator)
         self._key = key
+        self._filter = publish_filter
+        self._source = sensor_config.get("source")
+        self._always_available = sensor_config.get("always_available", False)
+        self._volatile = sensor_config.get("volatile", False)
+        self._history = sensor_config.get("history")
+        self._value = status_accessor(key)
         self._entry_id = entry_id
         self._host = host
         self._attr_name = sensor_config["name"]
@@ -178,27 +419,83 @@ class GreencellSensor(CoordinatorEntity["GreencellCoordinator"], SensorEntity):
             self._attr_entity_registry_enabled_default = sensor_config["enabled_by_default"]
         self._attr_unique_id = f"greencell_{entry_id}_{key}"
 
+    @property
+    def available(self) -> bool:
+        return self._always_available or super().available
+
+    def _raw_value(self) -> Any:
+        if self._source is not None:
+            return getattr(self.coordinator, self._source, None)
+        data = self.coordinator.data
+        return self._value(data) if data is not None else None
+
+    @property
+    def native_value(self) -> Any:
+        if self._filter is None:
+            return self._raw_value()
+        if not self._filter.has_value:
+            self._filter.offer(self._raw_value(), time.monotonic())
+        return self._filter.value
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        if self._history is None:
+            return None
+        return self.coordinator.history_coverage(*self._history)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        if self._filter is None:
+            publish = self._volatile or self.coordinator.has_changed(self._key)
+        else:
+            publish = self._filter.offer(self._raw_value(), time.monotonic())
+            # Availability changes must be written even when the value is held
+            publish = publish or self.coordinator.has_changed()
+        if publish:
+            super()._handle_coordinator_update()
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return self.coordinator.device_info
+
+
+class GreencellStatisticsSensor(
+    CoordinatorEntity["GreencellStatisticsCoordinator"], SensorEntity
+):
+    _attr_has_entity_name = True
+
+    def __init__(self, coordinator, entry_id, key, sensor_config):
+        super().__init__(coordinator)
+        self._key = key
+        self._value = sensor_config["value"]
+        self._attributes = sensor_config.get("attributes")
+        self._attr_name = sensor_config["name"]
+        self._attr_native_unit_of_measurement = sensor_config["unit"]
+        self._attr_icon = sensor_config.get("icon")
+        self._attr_device_class = sensor_config.get("device_class")
+        self._attr_entity_category = sensor_config.get("entity_category")
+        if sensor_config.get("enabled_by_default") is not None:
+            self._attr_entity_registry_enabled_default = sensor_config["enabled_by_default"]
+        self._attr_unique_id = f"greencell_{entry_id}_{key}"
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        if self.coordinator.data is None:
+            # The first listener only schedules a refresh one interval out
+            self.hass.async_create_task(self.coordinator.async_request_refresh())
+
     @property
     def native_value(self) -> Any:
-        if self._key == "macAddress":
-            return getattr(self.coordinator, "mac_address", None)
-        data = self.coordinator.data or {}
-        return data.get(self._key)
+        data = self.coordinator.data
+        return self._value(data) if data is not None else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        data = self.coordinator.data
+        if self._attributes is None or data is None:
+            return None
+        return self._attributes(data)
 
     @property
     def device_info(self) -> DeviceInfo:
-        spec = getattr(self.coordinator, "specification", None) or {}
-        model = spec.get("name") or (
-            ", ".join(spec["codes"]) if spec.get("codes") else None
-        )
-        connections = set()
-        if getattr(self.coordinator, "mac_address", None):
-            connections.add((dr.CONNECTION_NETWORK_MAC, self.coordinator.mac_address))
-        return DeviceInfo(
-            identifiers={(DOMAIN, self._entry_id)},
-            name=self.coordinator.device_name,
-            manufacturer=MANUFACTURER,
-            model=model,
-            connections=connections,
-            configuration_url=self.coordinator.configuration_url,
-        )
+        return self.coordinator.device_info
@@ -0,0 +1,148 @@
+"""Parsed, compact snapshot of /api/current_parameters."""
+from __future__ import annotations
+
+from operator import attrgetter
+from typing import Any, Callable, Mapping
+
+# Float noise from the device (e.g. 12.600000000000001) is rounded away
+FLOAT_DIGITS = 6
+
+
+def _number(value: Any) -> int | float | None:
+    if value is None or isinstance(value, bool):
+        return None if value is None else int(value)
+    if isinstance(value, int):
+        return value
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if isinstance(value, str) and number.is_integer() and "." not in value:
+        return int(number)
+    return round(number, FLOAT_DIGITS)
+
+
+def _flag(value: Any) -> bool | None:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "on", "yes")
+    return bool(value)
+
+
+def _sequence(value: Any) -> tuple:
+    if value is None:
+        return ()
+    if isinstance(value, (list, tuple)):
+        return tuple(value)
+    return (value,)
+
+
+# API key -> (attribute name, converter)
+STATUS_FIELDS: dict[str, tuple[str, Callable[[Any], Any]]] = {
+    "inputVoltage": ("input_voltage", _number),
+    "inputVoltageFault": ("input_voltage_fault", _number),
+    "outputVoltage": ("output_voltage", _number),
+    "load": ("load", _number),
+    "inputFrequency": ("input_frequency", _number),
+    "batteryVoltage": ("battery_voltage", _number),
+    "temperature": ("temperature", _number),
+    "utilityFail": ("utility_fail", _flag),
+    "batteryLow": ("battery_low", _flag),
+    "bypassBoost": ("bypass_boost", _flag),
+    "failed": ("failed", _flag),
+    "offline": ("offline", _flag),
+    "testInProgress": ("test_in_progress", _flag),
+    "shutdownActive": ("shutdown_active", _flag),
+    "beeperOn": ("beeper_on", _flag),
+    "batteryLevel": ("battery_level", _number),
+    "active": ("active", _flag),
+    "connected": ("connected", _flag),
+    "status": ("status", _number),
+    "register": ("register", _sequence),
+    "issues": ("issues", _sequence),
+    "errno": ("errno", _number),
+    "inputVoltageNominal": ("input_voltage_nominal", _number),
+    "inputFrequencyNominal": ("input_frequency_nominal", _number),
+    "batteryVoltageNominal": ("battery_voltage_nominal", _number),
+    "inputCurrentNominal": ("input_current_nominal", _number),
+    "batteryNumberNominal": ("battery_number_nominal", _number),
+    "batteryVoltageHighNominal": ("battery_voltage_high_nominal", _number),
+    "batteryVoltageLowNominal": ("battery_voltage_low_nominal", _number),
+    "reg": ("reg", _number),
+}
+
+
+class UpsStatus:
+    """One parsed status payload; built once per refresh and shared by all entities."""
+
+    __slots__ = tuple(attr for attr, _ in STATUS_FIELDS.values()) + ("reg_bits", "extra")
+
+    def __init__(self) -> None:
+        for attr, _ in STATUS_FIELDS.values():
+            setattr(self, attr, None)
+        self.reg_bits: tuple[int, ...] = ()
+        self.extra: dict[str, Any] = {}
+
+    @classmethod
+    def from_payload(cls, payload: Mapping[str, Any]) -> UpsStatus:
+        status = cls()
+        for key, value in payload.items():
+            field = STATUS_FIELDS.get(key)
+            if field is None:
+                status.extra[key] = value
+            else:
+                setattr(status, field[0], field[1](value))
+        if isinstance(status.reg, int):
+            status.reg_bits = tuple(
+                bit for bit in range(status.reg.bit_length()) if status.reg >> bit & 1
+            )
+        return status
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Look up a value by its API key, like the raw payload dict."""
+        field = STATUS_FIELDS.get(key)
+        if field is None:
+            return self.extra.get(key, default)
+        value = getattr(self, field[0])
+        return default if value is None else value
+
+    def as_dict(self) -> dict[str, Any]:
+        data = {
+            key: list(value) if isinstance(value, tuple) else value
+            for key, (attr, _) in STATUS_FIELDS.items()
+            if (value := getattr(self, attr)) is not None
+        }
+        data.update(self.extra)
+        return data
+
+    def diff(self, other: UpsStatus | None) -> frozenset[str]:
+        """Return the API keys whose value differs from ``other``."""
+        if other is None:
+            return frozenset(STATUS_FIELDS) | frozenset(self.extra)
+        changed = {
+            key
+            for key, (attr, _) in STATUS_FIELDS.items()
+            if getattr(self, attr) != getattr(other, attr)
+        }
+        changed.update(
+            key
+            for key in self.extra.keys() | other.extra.keys()
+            if self.extra.get(key) != other.extra.get(key)
+        )
+        return frozenset(changed)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, UpsStatus):
+            return NotImplemented
+        return not self.diff(other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+
+def status_accessor(key: str) -> Callable[[UpsStatus], Any]:
+    """Return a fast getter for ``key`` on a UpsStatus."""
+    field = STATUS_FIELDS.get(key)
+    if field is None:
+        return lambda status: status.extra.get(key)
+    return attrgetter(field[0])
@@ -6,12 +6,12 @@ from homeassistant.components.switch import SwitchEntity
 from homeassistant.const import CONF_HOST, EntityCategory
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.core import callback
-from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .api import GreencellApiError
-from .const import DOMAIN, MANUFACTURER
+from .api import COMMAND_ACTIONS, GreencellApiError
+from .const import DOMAIN
+from .status import status_accessor
 
 if TYPE_CHECKING:
     from .coordinator import GreencellCoordinator
@@ -88,6 +88,7 @@ class GreencellSwitch(CoordinatorEntity["GreencellCoordinator"], SwitchEntity):
         self._entry_id = entry_id
         self._host = host
         self._conf = switch_conf
+        self._state_value = status_accessor(switch_conf["state_key"])
         self._attr_name = switch_conf["name"]
         self._attr_icon = switch_conf.get("icon")
         self._attr_entity_category = switch_conf.get("category")
@@ -95,32 +96,21 @@ class GreencellSwitch(CoordinatorEntity["GreencellCoordinator"], SwitchEntity):
 
     @property
     def is_on(self) -> bool:
-        data = self.coordinator.data or {}
-        state_key = self._conf.get("state_key")
-        if state_key == "shutdownActive":
+        data = self.coordinator.data
+        state = bool(self._state_value(data)) if data is not None else False
+        if self._conf.get("state_key") == "shutdownActive":
             # Consider ON when not shutdown
-            return not bool(data.get("shutdownActive"))
-        if state_key == "testInProgress":
-            return bool(data.get("testInProgress"))
-        return bool(data.get(state_key))
+            return not state
+        return state
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        if self.coordinator.has_changed(self._conf.get("state_key")):
+            super()._handle_coordinator_update()
 
     @property
     def device_info(self) -> DeviceInfo:
-        spec = getattr(self.coordinator, "specification", None) or {}
-        model = spec.get("name") or (
-            ", ".join(spec["codes"]) if spec.get("codes") else None
-        )
-        connections = set()
-        if getattr(self.coordinator, "mac_address", None):
-            connections.add((dr.CONNECTION_NETWORK_MAC, self.coordinator.mac_address))
-        return DeviceInfo(
-            identifiers={(DOMAIN, self._entry_id)},
-            name=self.coordinator.device_name,
-            manufacturer=MANUFACTURER,
-            model=model,
-            connections=connections,
-            configuration_url=self.coordinator.configuration_url,
-        )
+        return self.coordinator.device_info
 
     async def async_turn_on(self, **kwargs) -> None:
         await self._apply_state(True)
@@ -130,26 +120,26 @@ class GreencellSwitch(CoordinatorEntity["GreencellCoordinator"], SwitchEntity):
 
     async def _apply_state(self, turn_on: bool) -> None:
         method_conf = self._conf.get("toggle_method")
+        before = self.coordinator.data
         try:
             if isinstance(method_conf, dict):
                 method_name = method_conf["on"] if turn_on else method_conf["off"]
                 if method_name is None:
                     raise HomeAssistantError("Command not available for this action")
-                method = getattr(self.coordinator.api, method_name, None)
-                if method is None:
-                    raise HomeAssistantError(f"Command {method_name} not available")
-                resp = await method()
             else:
-                method = getattr(self.coordinator.api, method_conf, None)
-                if method is None:
-                    raise HomeAssistantError(f"Command {method_conf} not available")
-                resp = await method()
+                method_name = method_conf
+            method = getattr(self.coordinator.api, method_name, None)
+            if method is None:
+                raise HomeAssistantError(f"Command {method_name} not available")
+            resp = await method()
             if self._conf.get("check_response", False) and not self._is_success(resp):
                 message = f"Command did not succeed (response={resp})"
                 self._log_activity(message)
                 raise HomeAssistantError(message)
             self._log_success(turn_on)
-            await self.coordinator.async_refresh_current_parameters_with_delay(0.75)
+            self.coordinator.async_start_command_confirmation(
+                COMMAND_ACTIONS.get(method_name), before
+            )
         except GreencellApiError as err:
             self._log_activity(f"Command failed: {err}")
             raise HomeAssistantError(f"Command failed: {err}") from err
@@ -10,9 +10,14 @@ if "homeassistant.const" not in sys.modules:
     class Platform(str, Enum):
         SENSOR = "sensor"
         BINARY_SENSOR = "binary_sensor"
+        BUTTON = "button"
+        SWITCH = "switch"
 
     ha_const.CONF_HOST = "host"
+    ha_const.CONF_MAC = "mac"
     ha_const.CONF_PASSWORD = "password"
+    ha_const.CONF_SCAN_INTERVAL = "scan_interval"
+    ha_const.CONF_VERIFY_SSL = "verify_ssl"
     ha_const.Platform = Platform
 
     ha_module = types.ModuleType("homeassistant")
@@ -0,0 +1,65 @@
+import json
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from custom_components.greencell_ups.analytics import analyze_discharge, to_columns  # noqa: E402
+from custom_components.greencell_ups.measurements import Measurement  # noqa: E402
+
+SAMPLES_DIR = Path(__file__).parent / "samples"
+SAMPLE = [
+    Measurement.from_record(record)
+    for record in json.loads((SAMPLES_DIR / "statistics_test_measurements.json").read_text())
+]
+
+
+def test_columns_merge_duplicate_timestamps():
+    columns = to_columns(SAMPLE)
+    assert len(columns.time) == len({m.timestamp for m in SAMPLE})
+    assert columns.time[0] == 0.0
+    assert np.all(np.diff(columns.time) > 0)
+    assert columns.voltage[0] == pytest.approx(13.1)
+    assert to_columns([]) is None
+
+
+def test_flat_sample_has_no_extrapolated_runtime():
+    analysis = analyze_discharge(SAMPLE, low_nominal=10.98, rated_power=480, nominal_voltage=12)
+    assert analysis.samples == len({m.timestamp for m in SAMPLE})
+    assert analysis.duration == pytest.approx(9.047)
+    assert analysis.sag_slope < 0
+    assert analysis.internal_resistance is None  # the load never changed
+    assert analysis.time_to_low_nominal is None
+
+
+def _synthetic_discharge(seconds=600):
+    samples = []
+    for second in range(seconds):
+        load = 20 if second < 60 else 60
+        current = load / 100 * 480 / 12
+        voltage = 12.8 - 0.002 * second - 0.05 * current
+        samples.append(Measurement(1_000_000 + second * 1000, load, voltage, 100 - second // 10, True))
+        # Repeated timestamp, as the device logs them
+        samples.append(Measurement(1_000_000 + second * 1000, load, voltage, 100 - second // 10, True))
+    return samples
+
+
+def test_synthetic_discharge_is_characterized():
+    analysis = analyze_discharge(
+        _synthetic_discharge(seconds=240), low_nominal=10.98, rated_power=480, nominal_voltage=12
+    )
+    assert analysis.samples == 240
+    # The drift alone is 0.12 V/min; the load step adds to the sag
+    assert analysis.sag_slope < -0.002 * 60
+    assert analysis.internal_resistance == pytest.approx(0.05, rel=0.2)
+    assert analysis.low_nominal_extrapolated
+    # 12.8 - 0.05 * 24 V at full load, falling 2 mV/s towards 10.98 V
+    assert analysis.time_to_low_nominal == pytest.approx((12.8 - 0.05 * 24 - 10.98) / 0.002, rel=0.25)
+    assert len(analysis.discharge_curve) == 3
+
+
+def test_crossing_inside_the_test_is_measured_not_extrapolated():
+    analysis = analyze_discharge(_synthetic_discharge(seconds=900), low_nominal=11.0)
+    assert not analysis.low_nominal_extrapolated
+    assert analysis.time_to_low_nominal == pytest.approx((12.8 - 0.05 * 24 - 11.0) / 0.002, abs=1)
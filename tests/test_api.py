@@ -1,4 +1,7 @@
+import asyncio
+import base64
 import json
+import time
 from pathlib import Path
 import pytest
 from unittest.mock import patch
@@ -33,6 +36,8 @@ class DummyResponse:
         self.status = status
         self._json = json_data
         self._text = None
+        self.headers = {}
+        self.closed = False
 
     async def __aenter__(self):
         return self
@@ -50,6 +55,9 @@ class DummyResponse:
                 headers=None,
             )
 
+    def close(self):
+        self.closed = True
+
     async def json(self):
         return self._json
 
@@ -58,6 +66,11 @@ class DummyResponse:
             return self._text
         return str(self._json)
 
+    async def read(self):
+        if self._text is not None:
+            return self._text.encode()
+        return json.dumps(self._json).encode()
+
 
 class DummySession:
     def __init__(self):
@@ -72,7 +85,7 @@ class DummySession:
     async def __aexit__(self, exc_type, exc, tb):
         return False
 
-    def request(self, method, url, json=None, headers=None):
+    def request(self, method, url, json=None, headers=None, **kwargs):
         # Strip host prefix so we can inspect path easily
         path = url.replace("http://host", "")
         if method == "POST" and path == "/api/login":
@@ -128,17 +141,15 @@ class DummySession:
 
 
 @pytest.mark.asyncio
-async def test_login_sets_token(monkeypatch):
-    monkeypatch.setattr('aiohttp.ClientSession', lambda: DummySession())
-    api = GreencellApi("http://host", "pw")
+async def test_login_sets_token():
+    api = GreencellApi("http://host", "pw", session=DummySession())
     await api.login()
     assert api._token == "tok"
 
 
 @pytest.mark.asyncio
-async def test_fetch_status_reauths_on_401(monkeypatch):
-    monkeypatch.setattr('aiohttp.ClientSession', lambda: DummySession())
-    api = GreencellApi("http://host", "pw")
+async def test_fetch_status_reauths_on_401():
+    api = GreencellApi("http://host", "pw", session=DummySession())
     # simulate expired token so the first GET returns 401 and triggers re-login
     api._token = "expired"
     data = await api.fetch_status()
@@ -147,9 +158,8 @@ async def test_fetch_status_reauths_on_401(monkeypatch):
 
 
 @pytest.mark.asyncio
-async def test_fetch_specification_reauths_on_401(monkeypatch):
-    monkeypatch.setattr('aiohttp.ClientSession', lambda: DummySession())
-    api = GreencellApi("http://host", "pw")
+async def test_fetch_specification_reauths_on_401():
+    api = GreencellApi("http://host", "pw", session=DummySession())
     api._token = "expired"
     data = await api.fetch_specification()
     assert data == SAMPLE_SPEC
@@ -157,26 +167,23 @@ async def test_fetch_specification_reauths_on_401(monkeypatch):
 
 
 @pytest.mark.asyncio
-async def test_request_raises_on_http_error(monkeypatch):
-    monkeypatch.setattr('aiohttp.ClientSession', lambda: DummySession())
-    api = GreencellApi("http://host", "pw")
+async def test_request_raises_on_http_error():
+    api = GreencellApi("http://host", "pw", session=DummySession())
     with pytest.raises(GreencellRequestError):
         await api._request("GET", "/api/error")
 
 
 @pytest.mark.asyncio
-async def test_login_missing_token(monkeypatch):
-    monkeypatch.setattr('aiohttp.ClientSession', lambda: DummySession())
-    api = GreencellApi("http://host", "missing")
+async def test_login_missing_token():
+    api = GreencellApi("http://host", "missing", session=DummySession())
     with pytest.raises(GreencellResponseError):
         await api.login()
 
 
 @pytest.mark.asyncio
-async def test_toggle_beeper(monkeypatch):
+async def test_toggle_beeper():
     session = DummySession()
-    monkeypatch.setattr('aiohttp.ClientSession', lambda: session)
-    api = GreencellApi("http://host", "pw")
+    api = GreencellApi("http://host", "pw", session=session)
     api._token = "tok"
     resp = await api.toggle_beeper()
     assert resp == 1  # Commands return 1 on success
@@ -184,10 +191,9 @@ async def test_toggle_beeper(monkeypatch):
 
 
 @pytest.mark.asyncio
-async def test_shutdown_wakeup_short_test(monkeypatch):
+async def test_shutdown_wakeup_short_test():
     session = DummySession()
-    monkeypatch.setattr('aiohttp.ClientSession', lambda: session)
-    api = GreencellApi("http://host", "pw")
+    api = GreencellApi("http://host", "pw", session=session)
     api._token = "tok"
 
     assert await api.shutdown() == 1
@@ -199,14 +205,18 @@ async def test_shutdown_wakeup_short_test(monkeypatch):
 
 
 @pytest.mark.asyncio
-async def test_command_text_response(monkeypatch):
+async def test_command_text_response():
     class TextDummy(DummyResponse):
         def __init__(self, status, json_data, text_data):
             super().__init__(status, json_data)
             self._text = text_data
 
+        async def json(self):
+            # Device answers commands with text/html, which aiohttp refuses to decode
+            raise ValueError("Attempt to decode JSON with unexpected mimetype")
+
     class TextSession(DummySession):
-        def request(self, method, url, json=None, headers=None):
+        def request(self, method, url, json=None, headers=None, **kwargs):
             path = url.replace("http://host", "")
             if method == "POST" and path == "/api/login":
                 return DummyResponse(200, {"access_token": "tok"})
@@ -214,18 +224,16 @@ async def test_command_text_response(monkeypatch):
                 return TextDummy(200, {"unexpected": True}, "1")
             return DummyResponse(404, {})
 
-    monkeypatch.setattr('aiohttp.ClientSession', lambda: TextSession())
-    api = GreencellApi("http://host", "pw")
+    api = GreencellApi("http://host", "pw", session=TextSession())
     api._token = "tok"
     result = await api.toggle_beeper()
     assert result == 1
 
 
 @pytest.mark.asyncio
-async def test_fetch_statistics(monkeypatch):
+async def test_fetch_statistics():
     session = DummySession()
-    monkeypatch.setattr('aiohttp.ClientSession', lambda: session)
-    api = GreencellApi("http://host", "pw")
+    api = GreencellApi("http://host", "pw", session=session)
     tests = await api.fetch_statistics_tests()
     assert tests == SAMPLE_TESTS
 
@@ -250,3 +258,401 @@ async def test_fetch_statistics(monkeypatch):
 
     deleted = await api.delete_schedule("sched-1")
     assert deleted is True
+
+
+@pytest.mark.asyncio
+async def test_owned_session_is_pooled_and_closed(monkeypatch):
+    created = []
+
+    class PooledSession(DummySession):
+        def __init__(self, **kwargs):
+            super().__init__()
+            self.kwargs = kwargs
+            self.closed = False
+            created.append(self)
+
+        async def close(self):
+            self.closed = True
+
+    monkeypatch.setattr("aiohttp.ClientSession", PooledSession)
+    api = GreencellApi("http://host", "pw")
+    await api.login()
+    await api.fetch_statistics_tests()
+    await api.fetch_schedules()
+
+    assert len(created) == 1
+    connector = created[0].kwargs["connector"]
+    assert connector.limit_per_host == api.queue.max_in_flight == 3
+
+    await api.async_close()
+    assert created[0].closed
+    assert connector.closed
+
+
+@pytest.mark.asyncio
+async def test_concurrent_401s_share_one_login():
+    class CountingSession(DummySession):
+        def __init__(self):
+            super().__init__()
+            self.login_calls = 0
+
+        def request(self, method, url, json=None, headers=None, **kwargs):
+            path = url.replace("http://host", "")
+            if method == "POST" and path == "/api/login":
+                self.login_calls += 1
+                return DummyResponse(200, {"access_token": "fresh"})
+            if headers.get("Authorization") != "Bearer fresh":
+                return DummyResponse(401, {})
+            return super().request(method, url, json=json, headers=headers)
+
+    session = CountingSession()
+    api = GreencellApi("http://host", "pw", session=session)
+    api._token = "expired"
+    await asyncio.gather(
+        api.fetch_statistics_tests(),
+        api.fetch_schedules(),
+        api.toggle_beeper(),
+    )
+    assert session.login_calls == 1
+    assert api.login_count == 1
+
+
+def _jwt(claims):
+    def _b64(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+    return f"{_b64({'alg': 'none'})}.{_b64(claims)}.sig"
+
+
+@pytest.mark.asyncio
+async def test_token_is_renewed_before_jwt_expiry():
+    class JwtSession(DummySession):
+        def __init__(self, token):
+            super().__init__()
+            self.token = token
+            self.login_calls = 0
+
+        def request(self, method, url, json=None, headers=None, **kwargs):
+            if url.endswith("/api/login"):
+                self.login_calls += 1
+                return DummyResponse(200, {"access_token": self.token})
+            return DummyResponse(200, SAMPLE_STATUS)
+
+    session = JwtSession(_jwt({"exp": int(time.time()) + 3600}))
+    api = GreencellApi("http://host", "pw", session=session)
+    await api.fetch_status()
+    await api.fetch_status()
+    assert session.login_calls == 1
+
+    # Token close to expiry: the next poll logs in first instead of eating a 401
+    session.token = _jwt({"exp": int(time.time()) + 120})
+    await api.login()
+    assert api._token_refresh_at - api._token_issued_at == pytest.approx(108, abs=2)
+    api._token_refresh_at = time.monotonic()
+    await api.fetch_status()
+    assert session.login_calls == 3
+
+
+@pytest.mark.asyncio
+async def test_token_expiry_is_read_against_the_device_clock():
+    from email.utils import formatdate
+
+    class SkewedSession(DummySession):
+        def __init__(self, skew, date_header):
+            super().__init__()
+            self.skew = skew
+            self.date_header = date_header
+            self.login_calls = 0
+
+        def request(self, method, url, json=None, headers=None, **kwargs):
+            device_now = time.time() + self.skew
+            if url.endswith("/api/login"):
+                self.login_calls += 1
+                resp = DummyResponse(
+                    200, {"access_token": "tok", "expiration_date": device_now + 3600}
+                )
+            else:
+                resp = DummyResponse(200, SAMPLE_STATUS)
+            if self.date_header:
+                resp.headers = {"Date": formatdate(device_now, usegmt=True)}
+            return resp
+
+    # Device clock two hours behind, but it tells us so in its Date header
+    session = SkewedSession(-7200, date_header=True)
+    api = GreencellApi("http://host", "pw", session=session)
+    await api.login()
+    assert api._token_refresh_at - api._token_issued_at == pytest.approx(3570, abs=5)
+
+    # No Date header: the expiry looks past, so it is ignored rather than
+    # forcing a login before every poll
+    session = SkewedSession(-7200, date_header=False)
+    api = GreencellApi("http://host", "pw", session=session)
+    for _ in range(5):
+        await api.fetch_status()
+    assert session.login_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_specification_endpoint_is_probed_once():
+    class DeviceSpecOnlySession(DummySession):
+        def __init__(self):
+            super().__init__()
+            self.paths = []
+
+        def request(self, method, url, json=None, headers=None, **kwargs):
+            path = url.replace("http://host", "")
+            self.paths.append(path)
+            if path == "/api/specification":
+                return DummyResponse(404, {})
+            return super().request(method, url, json=json, headers=headers)
+
+    session = DeviceSpecOnlySession()
+    api = GreencellApi("http://host", "pw", session=session)
+    api._token = "tok"
+    assert await api.fetch_specification() == SAMPLE_SPEC
+    assert api.capabilities == {"specification": "/api/device/specification"}
+
+    session.paths.clear()
+    assert await api.fetch_specification() == SAMPLE_SPEC
+    assert session.paths == ["/api/device/specification"]
+
+
+@pytest.mark.asyncio
+async def test_unreachable_host_fails_fast_once_breaker_opens():
+    class DeadSession(DummySession):
+        def request(self, method, url, json=None, headers=None, **kwargs):
+            self.get_calls += 1
+            raise aiohttp.ClientConnectionError("host down")
+
+    session = DeadSession()
+    api = GreencellApi("http://host", "pw", session=session)
+    api._token = "tok"
+    for _ in range(api.breaker.failure_threshold):
+        with pytest.raises(GreencellRequestError):
+            await api.fetch_status()
+    assert api.breaker.state == "open"
+
+    calls = session.get_calls
+    with pytest.raises(GreencellRequestError, match="unreachable"):
+        await api.fetch_status()
+    assert session.get_calls == calls
+
+
+@pytest.mark.asyncio
+async def test_request_timeout_comes_from_latency_tracker():
+    class SlowResponse(DummyResponse):
+        async def __aenter__(self):
+            await asyncio.sleep(0.2)
+            return self
+
+    class SlowSession(DummySession):
+        def request(self, method, url, json=None, headers=None, **kwargs):
+            return SlowResponse(200, SAMPLE_STATUS)
+
+    api = GreencellApi(
+        "http://host",
+        "pw",
+        session=SlowSession(),
+        timeout_overrides={"/api/current_parameters": 0.05},
+    )
+    api._token = "tok"
+    with pytest.raises(GreencellRequestError, match="timed out"):
+        await api.fetch_status()
+    # The miss is counted, not fed into the latency window
+    assert api.latency.timeouts == {"/api/current_parameters": 1}
+    assert api.latency.percentile("/api/current_parameters", 0.5) is None
+
+    api.latency.overrides.clear()
+    assert await api.fetch_status() == SAMPLE_STATUS
+    assert api.latency.percentile("/api/current_parameters", 0.99) >= 0.2
+
+
+@pytest.mark.asyncio
+async def test_requests_are_instrumented_per_endpoint():
+    session = DummySession()
+    api = GreencellApi("http://host", "pw", session=session)
+    api._token = "tok"
+
+    await api.fetch_status()  # first GET answers 401, then re-login and retry
+    with pytest.raises(GreencellRequestError):
+        await api.fetch_test_measurements("fe1e76e7-75f5-4226-8ffa-ed27238d398b")
+
+    status = api.metrics.endpoints["/api/current_parameters"]
+    assert status.requests == 2
+    assert status.errors == {"GreencellAuthError": 1}
+    assert status.completed == 1
+    assert status.last_response_bytes == len(json.dumps(SAMPLE_STATUS))
+    assert status.last_decode_time is not None
+
+    measurements = api.metrics.endpoints["/api/statistics/tests/{id}/measurements"]
+    assert measurements.errors == {"GreencellRequestError": 1}
+    assert api.metrics.endpoints["/api/login"].requests == api.login_count == 1
+
+
+@pytest.mark.asyncio
+async def test_json_is_decoded_from_one_raw_read():
+    class HtmlJson(DummyResponse):
+        async def json(self):
+            raise AssertionError("body must be decoded from read()")
+
+        async def text(self):
+            raise AssertionError("body must be read once")
+
+    class HtmlSession(DummySession):
+        def request(self, method, url, json=None, headers=None, **kwargs):
+            if url.endswith("/api/commands"):
+                resp = HtmlJson(200, None)
+                resp._text = "not json"
+                return resp
+            return HtmlJson(200, SAMPLE_STATUS)
+
+    decoded = []
+
+    def decoder(body):
+        decoded.append(body)
+        return json.loads(body)
+
+    api = GreencellApi("http://host", "pw", session=HtmlSession(), json_decoder=decoder)
+    api._token = "tok"
+    assert await api.fetch_status() == SAMPLE_STATUS
+    assert await api.toggle_beeper() == "not json"
+    assert len(decoded) == 2
+
+
+@pytest.mark.asyncio
+async def test_invalid_json_raises_response_error():
+    class BrokenSession(DummySession):
+        def request(self, method, url, json=None, headers=None, **kwargs):
+            resp = DummyResponse(200, None)
+            resp._text = "<html>"
+            return resp
+
+    api = GreencellApi("http://host", "pw", session=BrokenSession())
+    api._token = "tok"
+    with pytest.raises(GreencellResponseError):
+        await api.fetch_status()
+
+
+class StreamedContent:
+    def __init__(self, body, size):
+        self._body = body
+        self._size = size
+
+    async def iter_chunked(self, size):
+        for start in range(0, len(self._body), self._size):
+            await asyncio.sleep(0)
+            yield self._body[start : start + self._size]
+
+
+@pytest.mark.asyncio
+async def test_test_measurements_are_streamed_as_tuples():
+    body = json.dumps(SAMPLE_TEST_MEASUREMENTS).encode()
+
+    class StreamSession(DummySession):
+        def request(self, method, url, json=None, headers=None, **kwargs):
+            resp = DummyResponse(200, None)
+            resp.content = StreamedContent(body, 50)
+            return resp
+
+    api = GreencellApi("http://host", "pw", session=StreamSession())
+    api._token = "tok"
+    measurements = [m async for m in api.iter_test_measurements("test-long")]
+
+    assert [m.timestamp for m in measurements] == [
+        record["timestamp"] for record in SAMPLE_TEST_MEASUREMENTS
+    ]
+    assert measurements[0].battery_voltage == SAMPLE_TEST_MEASUREMENTS[0]["battery_voltage"]
+    stats = api.metrics.endpoints["/api/statistics/tests/test-long/measurements"]
+    assert stats.last_response_bytes == len(body)
+
+
+@pytest.mark.asyncio
+async def test_truncated_measurement_stream_raises():
+    body = json.dumps(SAMPLE_TEST_MEASUREMENTS).encode()[:-10]
+
+    class StreamSession(DummySession):
+        def request(self, method, url, json=None, headers=None, **kwargs):
+            resp = DummyResponse(200, None)
+            resp.content = StreamedContent(body, 64)
+            return resp
+
+    api = GreencellApi("http://host", "pw", session=StreamSession())
+    api._token = "tok"
+    with pytest.raises(GreencellResponseError):
+        async for _ in api.iter_test_measurements("test-long"):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_slow_or_abandoned_measurement_stream_is_not_a_failure(monkeypatch):
+    monkeypatch.setattr("custom_components.greencell_ups.api.MEASUREMENT_STREAM_BUFFER", 1)
+    records = [dict(SAMPLE_TEST_MEASUREMENTS[0], timestamp=n) for n in range(20)]
+    body = json.dumps(records).encode()
+    responses = []
+
+    class StreamSession(DummySession):
+        def request(self, method, url, json=None, headers=None, **kwargs):
+            resp = DummyResponse(200, None)
+            resp.content = StreamedContent(body, 32)
+            responses.append(resp)
+            return resp
+
+    endpoint = "/api/statistics/tests/{id}/measurements"
+    api = GreencellApi(
+        "http://host", "pw", session=StreamSession(), timeout_overrides={endpoint: 0.05}
+    )
+    api._token = "tok"
+
+    # A reader slower than the timeout only exerts backpressure
+    seen = []
+    async for measurement in api.iter_test_measurements("fe1e76e7-75f5-4226-8ffa"):
+        seen.append(measurement.timestamp)
+        if len(seen) <= 2:
+            await asyncio.sleep(0.1)
+    assert seen == list(range(20))
+
+    stream = api.iter_test_measurements("fe1e76e7-75f5-4226-8ffa")
+    assert (await stream.__anext__()).timestamp == 0
+    await stream.aclose()
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+    assert responses[-1].closed
+    assert api.breaker.failures == 0
+    assert api.metrics.endpoints[endpoint].errors == {}
+    assert api.latency.timeouts == {}
+
+
+@pytest.mark.asyncio
+async def test_new_events_page_until_the_cursor_is_reached():
+    from custom_components.greencell_ups.events import MAX_EVENT_PAGE, EventCursor
+
+    log = [{"id": f"e{n}", "timestamp": n} for n in range(300, 0, -1)]  # newest first
+    limits = []
+
+    class EventSession(DummySession):
+        def request(self, method, url, json=None, headers=None, **kwargs):
+            limit = int(url.rsplit("=", 1)[1])
+            limits.append(limit)
+            return DummyResponse(200, log[:limit])
+
+    api = GreencellApi("http://host", "pw", session=EventSession())
+    api._token = "tok"
+    cursor = EventCursor()
+
+    # An empty cursor reads the largest page straight away
+    first = [event async for event in api.iter_new_events(cursor, page_size=100)]
+    assert [event["timestamp"] for event in first] == list(range(1, 301))
+    assert limits == [MAX_EVENT_PAGE]
+
+    log[:0] = [{"id": f"e{n}", "timestamp": n} for n in range(305, 300, -1)]
+    limits.clear()
+    fresh = [event async for event in api.iter_new_events(cursor, page_size=100)]
+    assert [event["id"] for event in fresh] == ["e301", "e302", "e303", "e304", "e305"]
+    assert limits == [100]
+
+    log[:0] = [{"id": f"e{n}", "timestamp": n} for n in range(555, 305, -1)]
+    limits.clear()
+    fresh = [event async for event in api.iter_new_events(cursor, page_size=100)]
+    assert len(fresh) == 250
+    assert limits == [100, 200, 400]
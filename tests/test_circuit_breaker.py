@@ -0,0 +1,56 @@
+from custom_components.greencell_ups import circuit_breaker
+from custom_components.greencell_ups.circuit_breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_probes_and_backs_off(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", clock)
+    changes = []
+    breaker = CircuitBreaker(
+        failure_threshold=2, base_delay=10, jitter=0, on_change=lambda: changes.append(breaker.state)
+    )
+
+    breaker.record_failure()
+    assert breaker.state == STATE_CLOSED
+    breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+    assert not breaker.allow()
+    assert breaker.retry_in() == 10
+
+    clock.now += 10
+    assert breaker.allow()
+    assert breaker.state == STATE_HALF_OPEN
+    assert not breaker.allow()
+
+    # Failed probe doubles the delay
+    breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+    assert breaker.retry_in() == 20
+
+    clock.now += 20
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == STATE_CLOSED
+    assert breaker.next_retry is None
+    assert changes == [STATE_OPEN, STATE_HALF_OPEN, STATE_OPEN, STATE_HALF_OPEN, STATE_CLOSED]
+
+
+def test_breaker_delay_is_capped():
+    breaker = CircuitBreaker(failure_threshold=1, base_delay=100, max_delay=150, jitter=0)
+    breaker.record_failure()
+    breaker._set_state(STATE_HALF_OPEN)
+    breaker.record_failure()
+    assert breaker._delay == 150
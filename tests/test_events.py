@@ -0,0 +1,38 @@
+import json
+
+from custom_components.greencell_ups.events import SEEN_EVENT_IDS, EventCursor
+
+
+def _event(n, timestamp=None):
+    return {"id": f"event-{n}", "timestamp": 1_000 + n if timestamp is None else timestamp}
+
+
+def test_cursor_rejects_seen_and_older_events():
+    cursor = EventCursor()
+    assert cursor.is_new(_event(5))
+    cursor.mark(_event(5))
+    assert cursor.newest == 1_005
+    assert not cursor.is_new(_event(5))
+    assert not cursor.is_new(_event(4))
+    assert cursor.is_new(_event(6))
+    # Same timestamp, different event
+    assert cursor.is_new({"id": "other", "timestamp": 1_005})
+
+
+def test_seen_ids_are_bounded_and_persisted():
+    cursor = EventCursor()
+    for n in range(SEEN_EVENT_IDS + 10):
+        cursor.mark(_event(n))
+    assert len(cursor) == SEEN_EVENT_IDS
+
+    restored = EventCursor.from_dict(json.loads(json.dumps(cursor.as_dict())))
+    assert restored.newest == cursor.newest
+    assert not restored.is_new(_event(SEEN_EVENT_IDS + 9))
+
+
+def test_events_without_ids_are_identified_by_content():
+    cursor = EventCursor()
+    event = {"type": "utilityFail", "date": 1_700}
+    cursor.mark(event)
+    assert not cursor.is_new(dict(event))
+    assert cursor.newest == 1_700
@@ -0,0 +1,40 @@
+from custom_components.greencell_ups.filters import SensorFilter, parse_deadband
+
+
+def test_parse_deadband():
+    assert parse_deadband("0.5") == (0.5, None)
+    assert parse_deadband(" 2% ") == (None, 2.0)
+    assert parse_deadband("") == (None, None)
+    assert parse_deadband(None) == (None, None)
+
+
+def test_absolute_deadband_suppresses_jitter():
+    filt = SensorFilter(deadband=1.0)
+    assert filt.offer(226.4, 0)
+    assert not filt.offer(226.5, 1)
+    assert not filt.offer(225.6, 2)
+    assert filt.offer(228.0, 3)
+    assert filt.value == 228.0
+
+
+def test_percent_deadband_and_heartbeat():
+    filt = SensorFilter(deadband_pct=2, heartbeat=60)
+    assert filt.offer(13.9, 0)
+    assert not filt.offer(13.8, 10)
+    assert filt.offer(13.5, 20)
+    # Within the deadband, but the heartbeat is due
+    assert filt.offer(13.4, 80)
+
+
+def test_min_interval_delays_significant_changes():
+    filt = SensorFilter(deadband=0.1, min_interval=30)
+    assert filt.offer(12.0, 0)
+    assert not filt.offer(11.0, 10)
+    assert filt.offer(11.0, 31)
+
+
+def test_non_numeric_changes_are_published():
+    filt = SensorFilter(deadband=5)
+    assert filt.offer(0, 0)
+    assert filt.offer("fault", 1)
+    assert not filt.offer("fault", 2)
@@ -0,0 +1,95 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from custom_components.greencell_ups.health import (
+    SECONDS_PER_YEAR,
+    BatteryHealth,
+    TestSummary,
+)
+from custom_components.greencell_ups.measurements import Measurement
+
+SAMPLES_DIR = Path(__file__).parent / "samples"
+SAMPLE_TESTS = json.loads((SAMPLES_DIR / "statistics_tests.json").read_text())
+SAMPLE_MEASUREMENTS = [
+    Measurement.from_record(record)
+    for record in json.loads((SAMPLES_DIR / "statistics_test_measurements.json").read_text())
+]
+DAY_MS = 24 * 3600 * 1000
+
+
+def _summary(n, sag, day, kind="short", duration=10.0, load=50.0):
+    return TestSummary(f"t{n}", kind, day * DAY_MS, duration, 13.0, 13.0 - sag, load)
+
+
+def test_summary_from_sample_test():
+    summary = TestSummary.from_test(SAMPLE_TESTS[2], SAMPLE_MEASUREMENTS)
+    assert summary.kind == "short"
+    assert summary.duration == pytest.approx(10.006)
+    assert summary.min_voltage == 13.0
+    assert summary.mean_load == pytest.approx(2.0)
+    # 0.1 V sag at 2 % load, with the load floored at 5 %
+    assert summary.metric == pytest.approx(2.0)
+    assert TestSummary.from_test(SAMPLE_TESTS[2], []) is None
+
+
+def test_sag_is_normalized_by_load():
+    health = BatteryHealth()
+    health.fold(_summary(1, 0.2, 0, load=20.0))
+    # Twice the load sags twice as far on the same battery
+    health.fold(_summary(2, 0.4, 1, load=40.0))
+    assert health.score == 100.0
+    # The same sag at half the load means the battery got worse
+    health.fold(_summary(3, 0.4, 2, load=20.0))
+    assert health.summaries[-1].metric == pytest.approx(2.0)
+    assert health.score == pytest.approx(0.3 * 50.0 + 0.7 * 100.0)
+
+
+def test_tests_are_folded_exactly_once():
+    health = BatteryHealth()
+    assert health.fold(_summary(1, 0.5, 0))
+    assert not health.fold(_summary(1, 2.0, 0))
+    assert health.count == 1
+    assert health.score == 100.0
+    assert health.degradation_rate is None
+
+
+def test_short_and_long_tests_are_scored_separately():
+    health = BatteryHealth()
+    for month in range(6):
+        health.fold(_summary(f"s{month}", 0.5, month * 30))
+    assert health.score == 100.0
+    assert health.degradation_rate == 0.0
+    # A long test sags much further, but only counts against other long tests
+    health.fold(_summary("l0", 3.0, 200, kind="long", duration=1800.0))
+    health.fold(_summary("l1", 3.0, 260, kind="long", duration=1500.0))
+    assert health.kinds["short"].score == 100.0
+    assert health.kinds["short"].count == 6
+    assert health.summaries[-1].metric == pytest.approx(750.0)
+    assert health.score == pytest.approx(0.3 * 83.33 + 0.7 * 100.0)
+    assert health.count == 8
+    assert set(health.by_kind()) == {"short", "long"}
+
+
+def test_degradation_rate_tracks_the_trend_incrementally():
+    health = BatteryHealth()
+    # Runtime drops 10 % of the first test per year, one test a month
+    for month in range(12):
+        day = month * 30
+        years = day * 86400 / SECONDS_PER_YEAR
+        health.fold(_summary(month, 3.0, day, kind="long", duration=3600 * (1 - 0.1 * years)))
+    assert health.degradation_rate == pytest.approx(10.0, abs=0.01)
+    assert health.score < 100.0
+
+    restored = BatteryHealth(json.loads(json.dumps(health.as_dict())))
+    assert restored.degradation_rate == health.degradation_rate
+    assert not restored.fold(_summary(3, 3.0, 90, kind="long"))
+    assert restored.fold(_summary(12, 3.0, 365, kind="long", duration=3000.0))
+    assert restored.count == 13
+
+
+def test_single_trend_data_is_refolded():
+    health = BatteryHealth({"folded": ["t1"], "summaries": [], "score": 90.0, "count": 1})
+    assert health.count == 0
+    assert health.fold(_summary(1, 0.5, 0))
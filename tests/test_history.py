@@ -0,0 +1,85 @@
+import copy
+import json
+from pathlib import Path
+
+import pytest
+
+from custom_components.greencell_ups.history import TestHistory
+from custom_components.greencell_ups.measurements import Measurement
+
+SAMPLES_DIR = Path(__file__).parent / "samples"
+SAMPLE_TESTS = json.loads((SAMPLES_DIR / "statistics_tests.json").read_text())
+SAMPLE_MEASUREMENTS = json.loads((SAMPLES_DIR / "statistics_test_measurements.json").read_text())
+
+RUNNING_ID = SAMPLE_TESTS[0]["id"]
+
+
+class FakeApi:
+    def __init__(self, tests):
+        self.tests = copy.deepcopy(tests)
+        self.downloaded = []
+
+    async def fetch_statistics_tests(self):
+        return copy.deepcopy(self.tests)
+
+    async def iter_test_measurements(self, test_id):
+        self.downloaded.append(test_id)
+        for record in SAMPLE_MEASUREMENTS:
+            yield Measurement.from_record(record)
+
+
+@pytest.mark.asyncio
+async def test_completed_tests_are_downloaded_once():
+    api = FakeApi(SAMPLE_TESTS)
+    history = TestHistory()
+
+    new = await history.async_sync(api)
+    assert sorted(new) == sorted(test["id"] for test in SAMPLE_TESTS[1:])
+    assert len(api.downloaded) == 3
+    assert history.dirty
+    assert history.get(RUNNING_ID).measurements[0].battery_level == 100
+
+    history.dirty = False
+    api.downloaded.clear()
+    assert await history.async_sync(api) == []
+    # Only the running test is fetched again
+    assert api.downloaded == [RUNNING_ID]
+    assert not history.dirty
+
+
+@pytest.mark.asyncio
+async def test_cache_survives_a_store_round_trip():
+    api = FakeApi(SAMPLE_TESTS)
+    history = TestHistory()
+    await history.async_sync(api)
+
+    restored = TestHistory(json.loads(json.dumps(history.as_dict())))
+    assert RUNNING_ID not in restored.completed
+    assert restored.completed.keys() == history.completed.keys()
+    test_id = SAMPLE_TESTS[1]["id"]
+    assert restored.get(test_id).measurements == history.get(test_id).measurements
+
+    api.downloaded.clear()
+    await restored.async_sync(api)
+    assert api.downloaded == [RUNNING_ID]
+
+
+@pytest.mark.asyncio
+async def test_finished_and_vanished_tests_update_the_cache():
+    api = FakeApi(SAMPLE_TESTS)
+    history = TestHistory()
+    await history.async_sync(api)
+    history.dirty = False
+
+    api.tests[0]["date_end"] = api.tests[0]["date_start"] + 60_000
+    del api.tests[2]
+    assert await history.async_sync(api) == [RUNNING_ID]
+    assert history.dirty
+    assert RUNNING_ID in history.completed
+    assert SAMPLE_TESTS[2]["id"] not in history.completed
+    assert not history.running
+
+    # An empty listing is treated as a glitch, not as a wiped history
+    api.tests = []
+    await history.async_sync(api)
+    assert len(history.completed) == 2
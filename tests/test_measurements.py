@@ -0,0 +1,62 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from custom_components.greencell_ups.measurements import JsonArrayParser, Measurement
+
+SAMPLE = (Path(__file__).parent / "samples" / "statistics_test_measurements.json").read_bytes()
+
+
+def _feed_all(parser, body, size):
+    elements = []
+    for start in range(0, len(body), size):
+        elements.extend(parser.feed(body[start : start + size]))
+    parser.close()
+    return elements
+
+
+@pytest.mark.parametrize("size", [1, 7, 64, 4096])
+def test_parser_matches_full_decode_for_any_chunking(size):
+    parser = JsonArrayParser()
+    assert _feed_all(parser, SAMPLE, size) == json.loads(SAMPLE)
+    assert parser.count == len(json.loads(SAMPLE))
+
+
+def test_parser_buffers_at_most_one_element():
+    record = json.loads(SAMPLE)[0]
+    body = json.dumps([record] * 500).encode()
+    parser = JsonArrayParser()
+    peak = 0
+    for start in range(0, len(body), 100):
+        parser.feed(body[start : start + 100])
+        peak = max(peak, len(parser._buffer))
+    parser.close()
+    assert parser.count == 500
+    assert peak < len(json.dumps(record)) + 100
+
+
+def test_parser_handles_split_multibyte_characters():
+    body = json.dumps([{"note": "zażółć"}], ensure_ascii=False).encode()
+    assert _feed_all(JsonArrayParser(), body, 1) == [{"note": "zażółć"}]
+
+
+def test_parser_rejects_truncated_and_non_array_bodies():
+    parser = JsonArrayParser()
+    parser.feed(SAMPLE[:200])
+    with pytest.raises(ValueError):
+        parser.close()
+    with pytest.raises(ValueError):
+        JsonArrayParser().feed(b'{"not": "an array"}')
+
+
+def test_measurement_drops_bookkeeping_fields():
+    record = json.loads(SAMPLE)[0]
+    measurement = Measurement.from_record(record)
+    assert measurement == (
+        record["timestamp"],
+        record["load"],
+        record["battery_voltage"],
+        record["battery_level"],
+        record["utility_fail"],
+    )
@@ -0,0 +1,83 @@
+from custom_components.greencell_ups.metrics import (
+    DEFAULT_TIMEOUT,
+    MAX_TIMEOUT,
+    MIN_LATENCY_SAMPLES,
+    MIN_TIMEOUT,
+    EndpointStats,
+    LatencyTracker,
+    endpoint_template,
+)
+
+
+def test_endpoint_template_collapses_ids_and_query():
+    assert endpoint_template("/api/current_parameters") == "/api/current_parameters"
+    assert (
+        endpoint_template("/api/statistics/tests/fe1e76e7-75f5-4226-8ffa-ed27238d398b/measurements")
+        == "/api/statistics/tests/{id}/measurements"
+    )
+    assert endpoint_template("/api/statistics/events?limit=1000") == "/api/statistics/events"
+
+
+def test_timeout_uses_defaults_until_enough_samples():
+    tracker = LatencyTracker()
+    endpoint = "/api/current_parameters"
+    assert tracker.timeout_for(endpoint) == DEFAULT_TIMEOUT
+    assert tracker.timeout_for("/api/statistics/tests/{id}/measurements") > DEFAULT_TIMEOUT
+
+    for _ in range(MIN_LATENCY_SAMPLES - 1):
+        tracker.record(endpoint, 0.05)
+    assert tracker.timeout_for(endpoint) == DEFAULT_TIMEOUT
+    tracker.record(endpoint, 0.05)
+    assert tracker.timeout_for(endpoint) == MIN_TIMEOUT
+
+
+def test_timeout_follows_p99_and_is_clamped():
+    tracker = LatencyTracker()
+    endpoint = "/api/statistics/tests"
+    for _ in range(20):
+        tracker.record(endpoint, 2.0)
+    assert tracker.percentile(endpoint, 0.99) == 2.0
+    assert tracker.timeout_for(endpoint) == 6.0
+
+    for _ in range(20):
+        tracker.record(endpoint, 500.0)
+    assert tracker.timeout_for(endpoint) == MAX_TIMEOUT
+
+
+def test_timeouts_are_counted_without_escalating():
+    tracker = LatencyTracker()
+    endpoint = "/api/current_parameters"
+    for _ in range(MIN_LATENCY_SAMPLES):
+        tracker.record(endpoint, 0.1)
+    timeout = tracker.timeout_for(endpoint)
+    for _ in range(5):
+        tracker.record_timeout(endpoint)
+    assert tracker.timeouts == {endpoint: 5}
+    assert tracker.timeout_for(endpoint) == timeout
+    assert tracker.endpoints == [endpoint]
+
+
+def test_overrides_win_and_zero_means_adaptive():
+    tracker = LatencyTracker({"/api/current_parameters": 12.0, "/api/statistics/tests": 0})
+    assert tracker.timeout_for("/api/current_parameters") == 12.0
+    assert tracker.timeout_for("/api/statistics/tests") == DEFAULT_TIMEOUT
+
+
+def test_endpoint_stats_histogram_and_errors():
+    stats = EndpointStats()
+    stats.record_latency(0.03)
+    stats.record_latency(0.3)
+    stats.record_latency(120.0)
+    stats.record_response(512, 0.002)
+    stats.record_error(ValueError("boom"))
+    stats.record_error(ValueError("boom"))
+
+    assert stats.completed == 3
+    assert stats.latency_buckets[0] == 1
+    assert stats.latency_buckets[-1] == 1
+    assert stats.error_count == 2
+    summary = stats.as_dict()
+    assert summary["errors"] == {"ValueError": 2}
+    assert summary["latency_histogram"]["<=0.5s"] == 1
+    assert summary["response_bytes"] == 512
+    assert summary["last_decode_time"] == 0.002
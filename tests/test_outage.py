@@ -0,0 +1,47 @@
+import pytest
+
+from custom_components.greencell_ups.outage import OutageRecorder
+from custom_components.greencell_ups.status import UpsStatus
+
+
+def _status(utility_fail, load=50, voltage=12.8, level=100):
+    return UpsStatus.from_payload(
+        {
+            "utilityFail": utility_fail,
+            "load": load,
+            "batteryVoltage": voltage,
+            "batteryLevel": level,
+            "outputVoltage": 230,
+        }
+    )
+
+
+def test_outage_is_summarized_when_power_returns():
+    recorder = OutageRecorder(capacity=16)
+    assert recorder.update(_status(False), 0.0) is None
+    assert not recorder.active
+
+    for second in range(1, 101):
+        recorder.update(_status(True, voltage=12.8 - second * 0.01, level=100 - second // 10), float(second))
+    assert recorder.active
+    assert len(recorder.buffer) == 16  # bounded however long the outage runs
+
+    record = recorder.update(_status(False), 101.0, rated_power=480)
+    assert not recorder.active
+    assert record.duration == 100.0
+    assert record.samples == 100
+    assert record.min_battery_voltage == pytest.approx(11.8)
+    assert record.min_battery_level == 90
+    # 50 % of 480 W for 99 s between the first and last sample
+    assert record.energy_wh == pytest.approx(240 * 99 / 3600, abs=0.001)
+    # The tail of the outage stays available until the next one starts
+    assert [row["time"] for row in recorder.buffer.rows()] == [float(n) for n in range(85, 101)]
+
+
+def test_energy_needs_the_rated_power():
+    recorder = OutageRecorder(capacity=4)
+    recorder.update(_status(True), 0.0)
+    recorder.update(_status(True), 10.0)
+    record = recorder.update(_status(False), 11.0)
+    assert record.energy_wh is None
+    assert record.samples == 2
@@ -0,0 +1,179 @@
+import asyncio
+
+import pytest
+
+from custom_components.greencell_ups import polling
+from custom_components.greencell_ups.polling import (
+    AdaptivePollPolicy,
+    CommandTracker,
+    FleetPollScheduler,
+    RequestCoalescer,
+)
+
+
+CALM = {"utilityFail": False, "batteryLow": False, "testInProgress": False, "load": 2}
+
+
+def test_adaptive_policy_polls_fast_during_outage():
+    policy = AdaptivePollPolicy(base=30, floor=2, ceiling=120)
+    assert policy.update(CALM) == 30
+    assert policy.update({**CALM, "utilityFail": True}) == 2
+    assert policy.update({**CALM, "testInProgress": True}) == 2
+
+
+def test_adaptive_policy_polls_fast_on_load_jump():
+    policy = AdaptivePollPolicy(base=30, floor=2, ceiling=120)
+    policy.update(CALM)
+    assert policy.update({**CALM, "load": 40}) == 2
+
+
+def test_adaptive_policy_backs_off_when_calm():
+    policy = AdaptivePollPolicy(base=30, floor=2, ceiling=120, stable_polls=2)
+    intervals = [policy.update(CALM) for _ in range(12)]
+    assert intervals[0] == 30
+    assert intervals == sorted(intervals)
+    assert intervals[-1] == 120
+
+
+@pytest.mark.asyncio
+async def test_fleet_scheduler_spreads_and_caps_polls():
+    loop = asyncio.get_running_loop()
+    scheduler = FleetPollScheduler(loop, max_concurrent=1, jitter=0)
+    started: dict[str, list[float]] = {}
+    in_flight = 0
+    peak = 0
+
+    def _refresh(key):
+        async def _run():
+            nonlocal in_flight, peak
+            started.setdefault(key, []).append(loop.time())
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+        return _run
+
+    origin = loop.time()
+    for key in ("a", "b", "c"):
+        scheduler.register(key, lambda: 0.2, _refresh(key))
+    await asyncio.sleep(0.5)
+    for key in ("a", "b", "c"):
+        scheduler.unregister(key)
+
+    assert peak == 1
+    offsets = sorted(times[0] - origin for times in started.values())
+    # Slots land at 0, 0.62 and 0.24 of the interval rather than all at once
+    assert offsets[1] - offsets[0] > 0.03
+    assert offsets[2] - offsets[1] > 0.03
+    assert all(len(times) >= 2 for times in started.values())
+    assert scheduler.lag("a") is None
+
+
+@pytest.mark.asyncio
+async def test_coalescer_shares_in_flight_request():
+    calls = 0
+
+    async def _request():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    coalescer = RequestCoalescer(asyncio.get_running_loop(), _request)
+    results = await asyncio.gather(*(coalescer.fetch() for _ in range(5)))
+    assert results == [1] * 5
+    assert coalescer.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_coalescer_fresh_fetch_waits_for_next_request():
+    calls = 0
+
+    async def _request():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    coalescer = RequestCoalescer(asyncio.get_running_loop(), _request)
+    first = asyncio.ensure_future(coalescer.fetch())
+    await asyncio.sleep(0)
+    fresh = await asyncio.gather(coalescer.fetch(fresh=True), coalescer.fetch(fresh=True))
+    assert await first == 1
+    assert fresh == [2, 2]
+
+
+@pytest.mark.asyncio
+async def test_command_tracker_confirms_expected_state(monkeypatch):
+    monkeypatch.setattr(polling, "CONFIRM_INITIAL_DELAY", 0.001)
+    states = iter([{"testInProgress": False}, {"testInProgress": True}])
+
+    async def _fetch():
+        return next(states)
+
+    tracker = CommandTracker(asyncio.get_running_loop(), _fetch)
+    result = await tracker.wait("shortTestOrder", None)
+    assert result.confirmed
+    assert result.polls == 2
+
+
+@pytest.mark.asyncio
+async def test_command_tracker_toggle_and_deadline(monkeypatch):
+    monkeypatch.setattr(polling, "CONFIRM_INITIAL_DELAY", 0.001)
+    monkeypatch.setattr(polling, "CONFIRM_MAX_DELAY", 0.002)
+
+    async def _unchanged():
+        return {"beeperOn": False}
+
+    tracker = CommandTracker(asyncio.get_running_loop(), _unchanged, timeout=0.02)
+    result = await tracker.wait("beeperToggleOrder", {"beeperOn": False})
+    assert not result.confirmed
+    assert result.polls > 1
+
+    async def _flipped():
+        return {"beeperOn": True}
+
+    tracker = CommandTracker(asyncio.get_running_loop(), _flipped)
+    result = await tracker.wait("beeperToggleOrder", {"beeperOn": False})
+    assert result.confirmed
+
+
+@pytest.mark.asyncio
+async def test_command_tracker_debounces_bursts_into_shared_polls(monkeypatch):
+    monkeypatch.setattr(polling, "CONFIRM_INITIAL_DELAY", 0.03)
+    status = {"testInProgress": False, "beeperOn": False}
+
+    async def _fetch():
+        return dict(status)
+
+    tracker = CommandTracker(asyncio.get_running_loop(), _fetch)
+
+    async def _command(pause, action):
+        await asyncio.sleep(pause)
+        if action == "shortTestOrder":
+            status["testInProgress"] = True
+        else:
+            status["beeperOn"] = True
+        return await tracker.wait(action, {"beeperOn": False})
+
+    results = await asyncio.gather(
+        _command(0, "shortTestOrder"), _command(0.01, "beeperToggleOrder")
+    )
+    assert all(result.confirmed for result in results)
+    # Both commands were confirmed by a single poll after the burst
+    assert tracker.polls == 1
+    assert tracker.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_command_tracker_close_cancels_waiters():
+    async def _fetch():
+        return {}
+
+    tracker = CommandTracker(asyncio.get_running_loop(), _fetch)
+    waiter = asyncio.ensure_future(tracker.wait("shutdownOrder", None))
+    await asyncio.sleep(0)
+    tracker.close()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
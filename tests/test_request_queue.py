@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+from custom_components.greencell_ups.request_queue import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_COMMAND,
+    PRIORITY_POLL,
+    RequestQueue,
+)
+
+
+def _job(log, name, hold=0.01):
+    async def _run():
+        log.append(f"start {name}")
+        await asyncio.sleep(hold)
+        log.append(f"end {name}")
+        return name
+
+    return _run
+
+
+@pytest.mark.asyncio
+async def test_queue_serializes_and_orders_by_priority():
+    queue = RequestQueue(limit=1)
+    log = []
+    first = asyncio.ensure_future(queue.run(PRIORITY_POLL, _job(log, "poll-1")))
+    await asyncio.sleep(0)
+    background = asyncio.ensure_future(
+        queue.run(PRIORITY_BACKGROUND, _job(log, "stats"))
+    )
+    poll = asyncio.ensure_future(queue.run(PRIORITY_POLL, _job(log, "poll-2")))
+    await asyncio.gather(first, background, poll)
+    # Polls are serialized; the statistics request runs in its own lane
+    assert log.index("start poll-2") > log.index("end poll-1")
+    assert log.index("start stats") < log.index("end poll-1")
+
+
+@pytest.mark.asyncio
+async def test_command_never_waits_behind_background_download():
+    queue = RequestQueue(limit=1)
+    log = []
+    download = asyncio.ensure_future(
+        queue.run(PRIORITY_BACKGROUND, _job(log, "download", hold=0.05))
+    )
+    await asyncio.sleep(0)
+    assert await queue.run(PRIORITY_COMMAND, _job(log, "shutdown")) == "shutdown"
+    assert "end download" not in log
+    await download
+
+
+@pytest.mark.asyncio
+async def test_duplicate_queued_polls_are_dropped():
+    queue = RequestQueue(limit=1)
+    log = []
+    busy = asyncio.ensure_future(queue.run(PRIORITY_POLL, _job(log, "busy")))
+    await asyncio.sleep(0)
+    results = await asyncio.gather(
+        queue.run(PRIORITY_POLL, _job(log, "poll-a"), key="status"),
+        queue.run(PRIORITY_POLL, _job(log, "poll-b"), key="status"),
+        busy,
+    )
+    assert results == ["poll-a", "poll-a", "busy"]
+    assert queue.dropped == 1
+    assert "start poll-b" not in log
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiter():
+    queue = RequestQueue(limit=1)
+
+    async def _fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        await queue.run(PRIORITY_POLL, _fail)
+    assert await queue.run(PRIORITY_POLL, _job([], "after")) == "after"
+
+
+@pytest.mark.asyncio
+async def test_poll_never_waits_behind_background_download():
+    queue = RequestQueue(limit=1)
+    log = []
+    download = asyncio.ensure_future(
+        queue.run(PRIORITY_BACKGROUND, _job(log, "download", hold=0.05))
+    )
+    await asyncio.sleep(0)
+    assert await queue.run(PRIORITY_POLL, _job(log, "poll")) == "poll"
+    assert "end download" not in log
+    # A second background request still waits for the first
+    second = asyncio.ensure_future(queue.run(PRIORITY_BACKGROUND, _job(log, "events")))
+    await asyncio.sleep(0)
+    assert "start events" not in log
+    await asyncio.gather(download, second)
+    assert log.index("start events") > log.index("end download")
+
+
+@pytest.mark.asyncio
+async def test_requests_in_flight_stay_within_max_in_flight():
+    queue = RequestQueue(limit=2)
+    in_flight = peak = 0
+
+    async def _job_counting():
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+
+    await asyncio.gather(
+        *(
+            queue.run(priority, _job_counting)
+            for priority in [PRIORITY_BACKGROUND]
+            + [PRIORITY_POLL] * 5
+            + [PRIORITY_COMMAND] * 2
+            + [PRIORITY_BACKGROUND] * 2
+        )
+    )
+    assert peak == queue.max_in_flight == 4
+
+
+@pytest.mark.asyncio
+async def test_close_cancels_running_and_queued_requests():
+    queue = RequestQueue(limit=1)
+    log = []
+    running = asyncio.ensure_future(queue.run(PRIORITY_POLL, _job(log, "slow", hold=10)))
+    queued = asyncio.ensure_future(queue.run(PRIORITY_POLL, _job(log, "next")))
+    await asyncio.sleep(0.001)
+    queue.close()
+    for waiter in (running, queued):
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+    assert log == ["start slow"]
+    await asyncio.sleep(0)
+    assert not queue._tasks
@@ -0,0 +1,42 @@
+import pytest
+
+from custom_components.greencell_ups.measurements import Measurement
+from custom_components.greencell_ups.runtime import RuntimeEstimator
+from custom_components.greencell_ups.status import UpsStatus
+
+
+def _status(load, level, utility_fail):
+    return UpsStatus.from_payload(
+        {"load": load, "batteryLevel": level, "utilityFail": utility_fail}
+    )
+
+
+def test_no_estimate_until_a_discharge_was_seen():
+    estimator = RuntimeEstimator()
+    assert estimator.update(_status(20, 100, False), 0.0) is None
+    assert estimator.load == 20
+
+
+def test_discharge_on_battery_drives_the_estimate():
+    estimator = RuntimeEstimator()
+    # 1 % of battery every 30 s at 20 % load
+    for second in range(0, 301, 10):
+        estimator.update(_status(20, 100 - second // 30, True), float(second))
+    assert estimator.rate == pytest.approx(1 / 30 / 20)
+    remaining = estimator.remaining
+    assert remaining == pytest.approx(90 * 30, rel=0.05)
+
+    # Doubling the load roughly halves the runtime once the EWMA caught up
+    for second in range(310, 500, 10):
+        estimator.update(_status(40, 90, False), float(second))
+    assert estimator.remaining == pytest.approx(90 * 15, rel=0.1)
+
+
+def test_long_test_seeds_the_rate():
+    estimator = RuntimeEstimator()
+    measurements = [
+        Measurement(second * 1000, 50, 12.0, 100 - second // 60, False)
+        for second in range(0, 601, 5)
+    ]
+    assert estimator.learn_from_test(measurements) == pytest.approx(10 / 600 / 50)
+    assert estimator.update(_status(50, 80, False), 0.0) == pytest.approx(80 * 60, rel=0.01)
@@ -0,0 +1,82 @@
+import math
+
+import pytest
+
+from custom_components.greencell_ups.samples import RingBuffer, SampleHistory
+from custom_components.greencell_ups.status import UpsStatus, status_accessor
+
+
+def test_ring_buffer_keeps_the_newest_rows_in_order():
+    buffer = RingBuffer(4, {"time": "d", "load": "f"})
+    for n in range(6):
+        buffer.append(time=float(n), load=n * 10)
+    assert len(buffer) == 4
+    assert list(buffer.column("time")) == [2.0, 3.0, 4.0, 5.0]
+    assert [row["time"] for row in buffer.rows()] == [2.0, 3.0, 4.0, 5.0]
+
+
+def test_ring_buffer_before_wrapping_and_missing_values():
+    buffer = RingBuffer(8, {"voltage": "f", "count": "l"})
+    buffer.append(voltage=12.5, count=1)
+    buffer.append(count=2)
+    assert list(buffer.column("count")) == [1, 2]
+    assert math.isnan(buffer.column("voltage")[1])
+    buffer.clear()
+    assert len(buffer) == 0
+    with pytest.raises(ValueError):
+        RingBuffer(0, {"x": "d"})
+
+
+def test_sample_history_aggregates_recent_windows():
+    history = SampleHistory(
+        100, {"load": status_accessor("load"), "batteryVoltage": status_accessor("batteryVoltage")}
+    )
+    for second in range(0, 600, 10):
+        payload = {"load": 20 if second < 300 else 40, "batteryVoltage": 13.0 - second * 0.001}
+        if second == 100:
+            payload["load"] = None  # missing values are skipped, not stored
+        history.append(UpsStatus.from_payload(payload), float(second))
+
+    assert len(history) == 60
+    assert history.stats("load").count == 59
+    recent = history.stats("load", 250)
+    assert recent.minimum == recent.maximum == recent.mean == 40
+    trend = history.stats("batteryVoltage", 300)
+    assert trend.rate == pytest.approx(-0.06)
+    assert history.stats("batteryVoltage").minimum == pytest.approx(12.41)
+
+
+def test_sample_history_is_bounded_and_empty_windows_are_safe():
+    history = SampleHistory(10, {"load": status_accessor("load")})
+    assert history.stats("load").count == 0
+    for second in range(50):
+        history.append(UpsStatus.from_payload({"load": second}), float(second))
+    stats = history.stats("load")
+    assert (stats.count, stats.minimum, stats.maximum, stats.span) == (10, 40, 49, 9.0)
+    assert stats.rate == pytest.approx(60.0)
+
+
+def test_sample_history_folds_fast_polls_into_buckets():
+    history = SampleHistory(13, {"inputVoltage": status_accessor("inputVoltage")}, resolution=5.0)
+    # 1 s polls folded into 5 s buckets: 12 buckets cover the whole minute
+    for second in range(60):
+        voltage = 250 if second == 7 else 230 - (second % 5)
+        history.append(UpsStatus.from_payload({"inputVoltage": voltage}), float(second))
+
+    assert len(history) == 12
+    assert history.stats("inputVoltage", 4).mean == pytest.approx(228)
+    stats = history.stats("inputVoltage")
+    assert stats.count == 60
+    assert (stats.minimum, stats.maximum) == (226, 250)
+    assert stats.span == history.span("inputVoltage") == 55.0
+    assert history.stats("inputVoltage", 10).count == 15
+
+
+def test_ring_buffer_replace_last():
+    buffer = RingBuffer(2, {"value": "d"})
+    with pytest.raises(IndexError):
+        buffer.replace_last(value=1.0)
+    for value in (1.0, 2.0, 3.0):
+        buffer.append(value=value)
+    buffer.replace_last(value=4.0)
+    assert list(buffer.column("value")) == [2.0, 4.0]
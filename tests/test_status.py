@@ -0,0 +1,47 @@
+import json
+from pathlib import Path
+
+from custom_components.greencell_ups.status import UpsStatus, status_accessor
+
+SAMPLE_STATUS = json.loads(
+    (Path(__file__).parent / "samples" / "current_parameters.json").read_text()
+)
+
+
+def test_snapshot_normalizes_payload():
+    status = UpsStatus.from_payload(SAMPLE_STATUS)
+    assert status.battery_voltage_high_nominal == 12.6
+    assert status.input_voltage == 226.4
+    assert status.load == 2
+    assert status.utility_fail is False
+    assert status.offline is True
+    assert status.register == ()
+    assert status.reg == 8
+    assert status.reg_bits == (3,)
+    assert status.get("batteryLevel") == 100
+    assert status_accessor("inputFrequency")(status) == 50.1
+
+
+def test_snapshot_coerces_and_keeps_unknown_keys():
+    status = UpsStatus.from_payload(
+        {"load": "12", "beeperOn": "true", "issues": ["overload"], "newField": 1}
+    )
+    assert status.load == 12
+    assert status.beeper_on is True
+    assert status.issues == ("overload",)
+    assert status.get("newField") == 1
+    assert status_accessor("newField")(status) == 1
+    assert status.as_dict() == {
+        "load": 12,
+        "beeperOn": True,
+        "issues": ["overload"],
+        "newField": 1,
+    }
+
+
+def test_snapshot_diff():
+    before = UpsStatus.from_payload(SAMPLE_STATUS)
+    after = UpsStatus.from_payload({**SAMPLE_STATUS, "load": 40, "utilityFail": True})
+    assert after.diff(before) == {"load", "utilityFail"}
+    assert before == UpsStatus.from_payload(SAMPLE_STATUS)
+    assert before != after